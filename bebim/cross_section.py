@@ -1,8 +1,31 @@
 import numpy
 import scipy.interpolate
+from sibeira.log_table import LogTable
 from sibeira.species import *
 
 
+def get_S(N, B):
+    a0 = 0.52918e-10
+    return 4.0 * numpy.pi * a0**2 * N * (RYDBERG / B)**2
+
+
+def calculate(t, S, u, n, Q):
+    ln_t = numpy.log(t)
+    return S / (t + (u + 1.0) / n) * (
+        Q * ln_t / 2.0 * (1.0 - t**(-2)) +
+        (2.0 - Q) * (1.0 - 1.0/t - (ln_t / (t + 1.0)))
+    )
+
+
+def get_cross_sections(species, energy, ionisation_level=0, with_Q=True):
+    o = get_orbital_constant_arrays(species, ionisation_level)
+    energy = numpy.asarray(energy, dtype=float)
+    # the species axes lead, the energy axes follow
+    o = {field: value.reshape(value.shape + (1,) * energy.ndim) for field, value in o.items()}
+    Q = o['Q'] if with_Q else 1
+    return calculate(energy / o['B'], get_S(o['N'], o['B']), o['U'] / o['B'], o['n'], Q)
+
+
 class CrossSection:
     def __init__(self, species, ionisation_level=0, with_Q=True):
         if ionisation_level == 0:
@@ -31,18 +54,24 @@ class CrossSection:
         return self.U/self.B
 
     def get_S(self):
-        a0 = 0.52918e-10
-        return 4.0 * numpy.pi * a0**2 * self.N * (RYDBERG / self.B)**2
+        return get_S(self.N, self.B)
 
     def calculate(self, energy):
-        t = self.get_t(energy)
-        ln_t = numpy.log(t)
-        return self.S / (t + (self.u + 1.0) / self.n) * (
-            self.Q * ln_t / 2.0 * (1.0 - t**(-2)) +
-            (2.0 - self.Q) * (1.0 - 1.0/t - (ln_t / (t + 1.0)))
-        )
+        return calculate(self.get_t(energy), self.S, self.u, self.n, self.Q)
 
     def get_polynomial(self):
         energy = numpy.logspace(0.75, 5, 50)
         cross_section = self.calculate(energy)
         return scipy.interpolate.interp1d(energy, cross_section, fill_value="extrapolate")
+
+    def get_parameters(self):
+        return dict(B=self.B, U=self.U, N=self.N, n=self.n, Q=self.Q)
+
+    def get_threshold(self):
+        return self.B
+
+    def get_function(self):
+        return lambda energy: self.calculate(numpy.maximum(energy, self.get_threshold()))
+
+    def get_table(self, maximum=1e7, size=4096):
+        return LogTable(self.get_function(), self.get_threshold(), maximum, size)
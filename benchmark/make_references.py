@@ -0,0 +1,43 @@
+import json
+import sys
+import numpy
+import scipy.integrate
+
+from sibeira.integrator import RateIntegrator
+from benchmark.run import reference_path
+
+reference_cases = [('electron impact ionisation', 'Li', 40000, temperature, 1) for temperature in [10., 100., 1000.]] + \
+                  [('charge exchange', 'Li', 40000, temperature, dimension)
+                   for dimension in [0, 1, 2] for temperature in [10., 100., 1000.]]
+
+
+def get_reference_coefficient(reaction_name, beam_species, beam_energy, temperature, dimension, epsrel=1e-5):
+    rate = RateIntegrator(reaction_name, beam_species, beam_energy, temperature, dimension)
+    if dimension == 0:
+        lower, centre, upper = rate.get_isotropic_window()
+        value = sum(scipy.integrate.quad(rate.integrand_0d, a, b, epsabs=0, epsrel=epsrel * 1e-3, limit=500)[0]
+                    for a, b in [(lower, centre), (centre, upper)])
+        return value
+    upper = rate.get_speed_upper_bound()
+    if dimension == 1:
+        return scipy.integrate.quad(rate.integrand_1d, 0, upper, epsabs=0, epsrel=epsrel * 1e-3, limit=500)[0] / \
+            scipy.integrate.quad(rate.integrand_normalisation_1d, 0, upper, epsabs=0, epsrel=1e-10)[0]
+    return scipy.integrate.dblquad(rate.integrand_2d, 0, upper, -numpy.pi, numpy.pi, epsabs=0, epsrel=epsrel)[0] / \
+        scipy.integrate.dblquad(rate.integrand_normalisation_2d, 0, upper, -numpy.pi, numpy.pi,
+                                epsabs=0, epsrel=1e-10)[0]
+
+
+def main():
+    coefficients = []
+    for reaction_name, beam_species, beam_energy, temperature, dimension in reference_cases:
+        coefficient = get_reference_coefficient(reaction_name, beam_species, beam_energy, temperature, dimension)
+        coefficients.append(dict(reaction_name=reaction_name, beam_species=beam_species, beam_energy=beam_energy,
+                                 temperature=temperature, dimension=dimension, coefficient=coefficient))
+        print(coefficients[-1])
+    with open(reference_path, 'w') as f:
+        json.dump(dict(method='scipy.integrate.quad/dblquad, epsrel=1e-5', coefficients=coefficients), f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
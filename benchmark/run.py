@@ -0,0 +1,234 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy
+import scipy
+
+from sibeira.integrator import RateIntegrator
+from sibeira.rate_profile import RateProfile
+from sibeira.rate_profile_io import profile_database_cache
+from bebim.cross_section import CrossSection as BEBCrossSection
+from tabata_ctf.cross_section import CrossSection as TabataCrossSection
+
+reference_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'references.json')
+accuracy_tolerances = {'quad': 5e-3, 'gauss': 5e-3, 'qmc': 5e-3}
+
+
+def measure(function, repeat=5, minimum_time=0.2):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= minimum_time or number >= 2 ** 20:
+            break
+        number *= 2
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def quietly(function):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function()
+    return run
+
+
+def get_coefficient_cases(quick=False):
+    cases = {}
+    for reaction_name, dimensions in [('electron impact ionisation', [0, 1, 2]), ('charge exchange', [0, 1, 2, 3])]:
+        for dimension in dimensions:
+            for method in ['quad', 'gauss', 'qmc']:
+                if quick and method == 'quad' and dimension > 1:
+                    continue
+                name = 'coefficient/' + reaction_name.replace(' ', '_') + '/' + str(dimension) + 'd/' + method
+                cases[name] = (lambda r=reaction_name, d=dimension, m=method:
+                               RateIntegrator(r, 'Li', 40000, 1000, d, m).get_coefficient())
+    return cases
+
+
+def get_profile_cases(quick=False):
+    cases = {}
+    for profile_name, dimension in [('nrl', -1), ('beb', -1), ('tabata', 2)]:
+        for method in ['gauss'] if quick else ['quad', 'gauss']:
+            def set_profile(p=profile_name, d=dimension, m=method):
+                r = RateProfile('Li', 40000)
+                r.set_integration_method(m)
+                getattr(r, 'set_' + p + '_profile')(d)
+            cases['profile/' + profile_name + '/' + method] = quietly(set_profile)
+    return cases
+
+
+def get_attenuation_cases(quick=False):
+    r = RateProfile('Li', 40000)
+    profile = r.get_spline([10., 20., 50., 100., 200., 500., 1000.], [1e-14, 2e-14, 4e-14, 6e-14, 7e-14, 8e-14, 8e-14])
+    cases = {}
+    for size in [10 ** 3, 10 ** 5] if quick else [10 ** 3, 10 ** 5, 10 ** 6]:
+        radial_coordinates = numpy.linspace(0.6, 0.74, size)
+        temperatures = numpy.linspace(1000., 10., size)
+        densities = numpy.linspace(3e19, 1e17, size)
+        cases['attenuation/' + str(size)] = (lambda x=radial_coordinates, t=temperatures, n=densities:
+                                             r.get_attenuation_from_profile(profile, x, t, n))
+    return cases
+
+
+def get_cross_section_cases(quick=False):
+    energies = numpy.geomspace(10., 1e6, 10 ** 5)
+    beb = BEBCrossSection('Li')
+    tabata = TabataCrossSection('Li')
+    return {'cross_section/beb': lambda: beb.calculate(energies),
+            'cross_section/tabata': lambda: tabata.calculate(energies)}
+
+
+def get_database_cases(quick=False):
+    directory = tempfile.mkdtemp()
+    cases = {}
+    for profile_storage in ['pickle', 'columnar']:
+        r = RateProfile('Li', 40000)
+        r.set_profile_storage(profile_storage)
+        profile = r.get_spline([10., 100., 1000., 10000.], [1e-14, 5e-14, 8e-14, 9e-14])
+        storage_directory = os.path.join(directory, profile_storage)
+        r.export_profile('nrl', -1, profile, storage_directory)
+
+        def import_profile(r=r, d=storage_directory):
+            profile_database_cache.clear()
+            r.import_profile('nrl', -1, d)
+        cases['database/' + profile_storage + '/export'] = \
+            lambda r=r, d=storage_directory, p=profile: r.export_profile('nrl', -1, p, d)
+        cases['database/' + profile_storage + '/import'] = import_profile
+    return cases
+
+
+def get_import_time(module='sibeira.rate_profile', repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import ' + module], check=True, cwd=os.getcwd())
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def get_cases(quick=False):
+    cases = {}
+    for get_group in [get_coefficient_cases, get_profile_cases, get_attenuation_cases, get_cross_section_cases,
+                      get_database_cases]:
+        cases.update(get_group(quick))
+    return cases
+
+
+def run_timings(pattern='', quick=False, repeat=5):
+    timings = {}
+    for name, function in get_cases(quick).items():
+        if pattern in name:
+            timings[name] = measure(function, 1 if name.startswith('profile/') else repeat)
+            print(name + '  ' + format_time(timings[name]))
+    if pattern in 'import/sibeira.rate_profile':
+        timings['import/sibeira.rate_profile'] = get_import_time(repeat=repeat)
+        print('import/sibeira.rate_profile  ' + format_time(timings['import/sibeira.rate_profile']))
+    return timings
+
+
+def load_references(path=reference_path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_accuracy(references=None):
+    if references is None:
+        references = load_references()
+    deviations = {}
+    for reference in references['coefficients']:
+        for method, tolerance in accuracy_tolerances.items():
+            coefficient = RateIntegrator(reference['reaction_name'], reference['beam_species'],
+                                         reference['beam_energy'], reference['temperature'], reference['dimension'],
+                                         method).get_coefficient()
+            name = get_reference_name(reference) + '/' + method
+            deviations[name] = abs(coefficient / reference['coefficient'] - 1.0)
+            print(name + '  ' + '%.1e' % deviations[name] + ('' if deviations[name] <= tolerance else '  FAILED'))
+    return deviations
+
+
+def get_reference_name(reference):
+    return '/'.join([reference['reaction_name'].replace(' ', '_'), reference['beam_species'],
+                     str(reference['beam_energy']), str(reference['temperature']), str(reference['dimension']) + 'd'])
+
+
+def get_failed_accuracy(deviations):
+    return sorted(name for name, deviation in deviations.items()
+                  if deviation > accuracy_tolerances[name.rsplit('/', 1)[1]])
+
+
+def get_metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return dict(commit=commit, python=platform.python_version(), numpy=numpy.__version__, scipy=scipy.__version__,
+                machine=platform.machine(), processor=platform.processor())
+
+
+def compare(results, baseline, threshold=1.2):
+    regressions = []
+    for name, seconds in sorted(results['timings'].items()):
+        if name not in baseline['timings']:
+            continue
+        ratio = seconds / baseline['timings'][name]
+        print('%-60s %10s %10s %6.2fx' % (name, format_time(baseline['timings'][name]), format_time(seconds), ratio))
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def format_time(seconds):
+    for unit, factor in [('s', 1.0), ('ms', 1e-3), ('us', 1e-6)]:
+        if seconds >= factor:
+            return '%.3g %s' % (seconds / factor, unit)
+    return '%.3g ns' % (seconds / 1e-9)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Benchmark the SIBEIRA rate, profile and attenuation hot paths.')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio reported as a regression')
+    parser.add_argument('--filter', default='', help='only run the benchmarks whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='skip the slow quad and large cases')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--skip-accuracy', action='store_true')
+    arguments = parser.parse_args(arguments)
+
+    results = dict(metadata=get_metadata(), timings=run_timings(arguments.filter, arguments.quick, arguments.repeat))
+    failed = []
+    if not arguments.skip_accuracy:
+        results['accuracy'] = run_accuracy()
+        failed = get_failed_accuracy(results['accuracy'])
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    regressions = []
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as f:
+            regressions = compare(results, json.load(f), arguments.threshold)
+    for name in failed:
+        print('Accuracy check failed: ' + name)
+    for name in regressions:
+        print('Slower than the baseline: ' + name)
+    return 1 if failed or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,16 @@
 import numpy
 
-from bebim.cross_section import CrossSection
+from sibeira.species import get_orbital_constant_arrays
 
 
 def get_nrl_rate(species, ionisation_level, electron_temperature):
-    c = CrossSection(species, ionisation_level)
-    t = c.get_t(electron_temperature)
-    return 1e-11 * numpy.sqrt(t) / c.B ** 1.5 / (6.0 + t) * numpy.exp(-1.0 / t)
+    return get_nrl_rates(species, electron_temperature, ionisation_level)[()]
+
+
+def get_nrl_rates(species, electron_temperatures, ionisation_level=0):
+    electron_temperatures = numpy.asarray(electron_temperatures, dtype=float)
+    B = get_orbital_constant_arrays(species, ionisation_level)['B']
+    # the species axes lead, the temperature axes follow
+    B = B.reshape(B.shape + (1,) * electron_temperatures.ndim)
+    t = electron_temperatures / B
+    return 1e-11 * numpy.sqrt(t) / B ** 1.5 / (6.0 + t) * numpy.exp(-1.0 / t)
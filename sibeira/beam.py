@@ -1,7 +1,5 @@
 import numpy
 import scipy.constants
-import scipy.integrate
-import scipy.stats
 
 
 class Beam:
@@ -0,0 +1,73 @@
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from sibeira import instrumentation
+
+
+def get_key(description):
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class CoefficientCache:
+    def __init__(self, directory=None, size=4096):
+        self.directory = directory
+        self.size = size
+        self.memory = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, description):
+        key = get_key(description)
+        with self.lock:
+            coefficient = self.memory.get(key)
+            if coefficient is not None:
+                self.memory.move_to_end(key)
+        if coefficient is not None:
+            instrumentation.count('coefficient_cache/memory_hit')
+            return coefficient
+        coefficient = self.read(key)
+        if coefficient is not None:
+            self.remember(key, coefficient)
+        instrumentation.count('coefficient_cache/' + ('miss' if coefficient is None else 'disk_hit'))
+        return coefficient
+
+    def set(self, description, coefficient):
+        key = get_key(description)
+        self.remember(key, coefficient)
+        self.write(key, description, coefficient)
+
+    def remember(self, key, coefficient):
+        with self.lock:
+            self.memory[key] = coefficient
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.size:
+                self.memory.popitem(last=False)
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def read(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self.get_path(key)) as f:
+                return json.load(f)['coefficient']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def write(self, key, description, coefficient):
+        if self.directory is None:
+            return
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(handle, 'w') as f:
+            json.dump({'description': description, 'coefficient': coefficient}, f)
+        os.replace(temporary_path, path)
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
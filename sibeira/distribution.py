@@ -0,0 +1,24 @@
+import numpy
+import scipy.constants
+import scipy.special
+
+
+class Maxwellian:
+    def __init__(self, temperature, mass, drift_velocity=0.0):
+        self.temperature = numpy.broadcast_to(numpy.asarray(temperature, dtype=float), (3,))
+        if numpy.any(self.temperature <= 0):
+            raise ValueError('Temperature must be positive: ' + str(temperature))
+        self.mass = mass
+        self.drift_velocity = numpy.broadcast_to(numpy.asarray(drift_velocity, dtype=float), (3,))
+
+    def get_thermal_speed(self):
+        return numpy.sqrt(self.temperature * scipy.constants.elementary_charge / self.mass)
+
+    def sample(self, uniform):
+        shape = (3,) + (1,) * (numpy.ndim(uniform) - 1)
+        return self.drift_velocity.reshape(shape) + \
+            self.get_thermal_speed().reshape(shape) * scipy.special.ndtri(uniform)
+
+    def get_parameters(self):
+        return dict(distribution=type(self).__name__, temperature=self.temperature.tolist(), mass=float(self.mass),
+                    drift_velocity=self.drift_velocity.tolist())
@@ -0,0 +1,91 @@
+import functools
+import numpy
+
+from sibeira.quadrature import read_only
+from sibeira.rate import Rate
+from sibeira.rate_profile import RateProfile, get_cumulative_trapezoid
+
+default_dimensions = {'nrl': -1, 'beb': -1, 'tabata': 2}
+default_reference_temperatures = (10., 20., 50., 100., 200., 500., 1000.)
+
+
+def get_dimension(model, dimension=None):
+    if model not in default_dimensions:
+        raise ValueError('Invalid profile: ' + str(model))
+    return default_dimensions[model] if dimension is None else dimension
+
+
+def get_rate(species, beam_energy, ionisation_level=0, integration_method='quad', double_charge_exchange=False):
+    r = Rate(species, beam_energy, ionisation_level)
+    r.set_integration_method(integration_method)
+    r.set_double_charge_exchange(double_charge_exchange)
+    return r
+
+
+def compute_rate(species, beam_energy, temperature, model, dimension=None, ionisation_level=0,
+                 integration_method='quad', double_charge_exchange=False):
+    dimension = get_dimension(model, dimension)
+    r = get_rate(species, beam_energy, ionisation_level, integration_method, double_charge_exchange)
+    r.set_profiles(temperature)
+    return getattr(r, 'get_full_rate_with_' + model)(dimension)
+
+
+def compute_rates(species, beam_energy, temperatures, model, dimension=None, ionisation_level=0,
+                  double_charge_exchange=False):
+    dimension = get_dimension(model, dimension)
+    r = get_rate(species, beam_energy, ionisation_level, 'gauss', double_charge_exchange)
+    return getattr(r, 'get_full_rates_with_' + model)(numpy.asarray(temperatures, dtype=float), dimension)
+
+
+def compute_profile(species, beam_energy, model, dimension=None, ionisation_level=0, integration_method='quad',
+                    double_charge_exchange=False, temperatures=default_reference_temperatures, executor=None):
+    dimension = get_dimension(model, dimension)
+    function = functools.partial(compute_rate, species, beam_energy, model=model, dimension=dimension,
+                                 ionisation_level=ionisation_level, integration_method=integration_method,
+                                 double_charge_exchange=double_charge_exchange)
+    rates = list(map(function, temperatures) if executor is None else executor.map(function, temperatures))
+    return ImmutableRateProfile(species, beam_energy, model, dimension, temperatures, rates, ionisation_level,
+                                double_charge_exchange)
+
+
+def load_profile(species, beam_energy, model, dimension=None, ionisation_level=0, integration_method='quad',
+                 double_charge_exchange=False):
+    dimension = get_dimension(model, dimension)
+    r = RateProfile(species, beam_energy, ionisation_level)
+    r.set_integration_method(integration_method)
+    r.set_double_charge_exchange(double_charge_exchange)
+    spline = r.get_profile(model, dimension)
+    return ImmutableRateProfile(species, beam_energy, model, dimension, numpy.exp(spline.x), numpy.exp(spline.y),
+                                ionisation_level, double_charge_exchange, getattr(spline, 'error', None))
+
+
+class ImmutableRateProfile:
+    def __init__(self, species, beam_energy, model, dimension, temperatures, rates, ionisation_level=0,
+                 double_charge_exchange=False, error=None):
+        temperatures = read_only(numpy.array(temperatures, dtype=float))
+        rates = read_only(numpy.array(rates, dtype=float))
+        if temperatures.shape != rates.shape:
+            raise ValueError('The temperatures and rates differ in shape: ' + str(temperatures.shape) + ', ' +
+                             str(rates.shape))
+        self.__dict__.update(species=species, beam_energy=beam_energy, model=model, dimension=dimension,
+                             ionisation_level=ionisation_level, double_charge_exchange=double_charge_exchange,
+                             temperatures=temperatures, rates=rates, error=error,
+                             speed=Rate(species, beam_energy, ionisation_level).speed,
+                             spline=RateProfile.get_spline(temperatures, rates))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('The rate profile is immutable: ' + name)
+
+    def __delattr__(self, name):
+        raise AttributeError('The rate profile is immutable: ' + name)
+
+    def get_key(self):
+        return self.species, float(self.beam_energy), self.model, self.dimension, self.ionisation_level, \
+            self.double_charge_exchange
+
+    def get_rate(self, temperatures):
+        return RateProfile.resolve_log_spline(self.spline, temperatures)
+
+    def get_attenuation(self, radial_coordinates, temperatures, densities):
+        rate = self.get_rate(temperatures) * densities / self.speed
+        return numpy.exp(get_cumulative_trapezoid(rate, numpy.asarray(radial_coordinates, dtype=float)))
@@ -0,0 +1,90 @@
+import collections
+import contextlib
+import threading
+import time
+import numpy
+
+recorder = None
+
+
+class Recorder:
+    def __init__(self):
+        self.counters = collections.Counter()
+        self.timers = collections.defaultdict(float)
+        self.timer_calls = collections.Counter()
+        self.errors = collections.defaultdict(list)
+        self.lock = threading.Lock()
+
+    def count(self, name, increment=1):
+        with self.lock:
+            self.counters[name] += increment
+
+    @contextlib.contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            self.timers[name] += seconds
+            self.timer_calls[name] += 1
+
+    def wrap(self, name, function):
+        def timed_function(*args):
+            start = time.perf_counter()
+            result = function(*args)
+            self.add_time(name, time.perf_counter() - start)
+            self.count(name + '/points', numpy.size(result))
+            return result
+        return timed_function
+
+    def record_error(self, name, value, error):
+        value, error = numpy.broadcast_arrays(numpy.abs(numpy.asarray(value, dtype=float)),
+                                              numpy.abs(numpy.asarray(error, dtype=float)))
+        # a vanishing coefficient has no relative error, its absolute error is recorded instead
+        relative_error = float(numpy.max(numpy.divide(error, value, out=error.copy(), where=value != 0.0)))
+        with self.lock:
+            self.errors[name].append(relative_error)
+
+    def get_report(self):
+        return dict(counters=dict(self.counters),
+                    timers={name: dict(seconds=seconds, calls=self.timer_calls[name])
+                            for name, seconds in self.timers.items()},
+                    errors={name: dict(count=len(errors), maximum=max(errors), mean=sum(errors) / len(errors))
+                            for name, errors in self.errors.items()})
+
+    def clear(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.timer_calls.clear()
+        self.errors.clear()
+
+
+@contextlib.contextmanager
+def recording(new_recorder=None):
+    global recorder
+    previous_recorder = recorder
+    recorder = Recorder() if new_recorder is None else new_recorder
+    try:
+        yield recorder
+    finally:
+        recorder = previous_recorder
+
+
+def print_progress(label, completed, total):
+    if completed < total:
+        print(label + '  ' + str(int(completed / total * 100)) + '%', end='\r')
+    else:
+        print(label + ' 100%')
+
+
+def count(name, increment=1):
+    if recorder is not None:
+        recorder.count(name, increment)
+
+
+def time_stage(name):
+    return contextlib.nullcontext() if recorder is None else recorder.time(name)
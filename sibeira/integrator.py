@@ -1,28 +1,156 @@
+import copy
+import functools
 import numpy
 import scipy.constants
 import scipy.integrate
 import scipy.stats
 
+from sibeira import instrumentation
 from sibeira.beam import Beam
+from sibeira.distribution import Maxwellian
+from sibeira.quadrature import GaussQuadrature, QuasiMonteCarlo
 from bebim.cross_section import CrossSection as BEBCrossSection
 from tabata_ctf.cross_section import CrossSection as TabataCrossSection
 
 
 class RateIntegrator:
-    def __init__(self, reaction_name, beam_species, beam_energy, temperature, dimension=2):
+    laguerre_alpha = 0.5
+    isotropic_half_width = 12.0
+    coefficient_cache = None
+    tail_tolerance = 1e-12
+    quad_tolerance = None
+
+    def __init__(self, reaction_name, beam_species, beam_energy, temperature, dimension=2, method='quad',
+                 cross_section_method='polynomial'):
         self.reaction_name = reaction_name
+        self.cross_section_method = cross_section_method
         self.temperature = temperature
         self.beam_species = beam_species
         self.beam_energy = beam_energy
         self.beam_speed = self.get_projectile_velocity()
         self.target_mass = self.get_target_mass()
-        self.cross_section = self.get_cross_section()
+        with instrumentation.time_stage('integrator/cross_section_setup'):
+            self.cross_section = self.get_cross_section()
+            self.threshold_energy = self.get_threshold_energy()
         self.normalisation_factor = 1
         self.maxwell_normalisation_factor = self.get_maxwell_normalisation_factor(temperature)
-        self.set_integrator(dimension)
+        self.distribution = None
+        self.set_integrator(dimension, method)
 
     def get_coefficient(self):
-        return self.integrate(self.integrand) / self.integrate(self.integrand_normalisation)
+        if self.coefficient_cache is None:
+            return self.get_coefficient_with_error()[0]
+        description = self.get_description()
+        coefficient = self.coefficient_cache.get(description)
+        if coefficient is None:
+            coefficient = float(self.get_coefficient_with_error()[0])
+            self.coefficient_cache.set(description, coefficient)
+        return coefficient
+
+    def get_description(self):
+        description = dict(integrator=type(self).__name__, reaction_name=self.reaction_name,
+                           beam_species=self.beam_species, beam_energy=float(self.beam_energy),
+                           temperature=float(self.temperature), dimension=self.dimension, method=self.method,
+                           cross_section_method=self.cross_section_method,
+                           cross_section=self.get_cross_section_model().get_parameters())
+        if self.method == 'gauss':
+            description['quadrature'] = [self.quadrature.speed_order, self.quadrature.angle_order,
+                                         self.quadrature.laguerre_alpha]
+        elif self.method == 'qmc':
+            description['qmc'] = [self.quasi_monte_carlo.samples, self.quasi_monte_carlo.scrambles,
+                                  self.quasi_monte_carlo.sequence, self.quasi_monte_carlo.seed]
+        elif self.dimension > 0:
+            # the Gauss-Laguerre estimate scales the absolute tolerance of QUADPACK
+            description['quad'] = [self.quad_tolerance, self.tail_tolerance, self.laguerre_alpha]
+        if self.dimension == 0 and self.method != 'qmc':
+            description['isotropic_half_width'] = self.isotropic_half_width
+        if self.distribution is not None:
+            description['distribution'] = self.distribution.get_parameters()
+        return description
+
+    def get_coefficient_with_error(self):
+        if instrumentation.recorder is not None:
+            return self.get_instrumented_coefficient_with_error(instrumentation.recorder)
+        value, error = self.integrate_with_error(self.integrand)
+        normalisation = self.get_normalisation()
+        return value / normalisation, error / normalisation
+
+    def get_instrumented_coefficient_with_error(self, recorder):
+        cross_section = self.cross_section
+        self.cross_section = recorder.wrap('integrator/cross_section', cross_section)
+        self.maxwell = recorder.wrap('integrator/maxwell', self.maxwell)
+        try:
+            with recorder.time('integrator/integrate'):
+                value, error = self.integrate_with_error(recorder.wrap('integrator/integrand', self.integrand))
+            with recorder.time('integrator/normalisation'):
+                normalisation = self.get_normalisation()
+        finally:
+            self.cross_section = cross_section
+            del self.maxwell
+        recorder.count('integrator/' + self.method)
+        recorder.record_error('integrator/' + self.method, value, error)
+        return value / normalisation, error / normalisation
+
+    def get_normalisation(self):
+        if self.method == 'quad':
+            return self.integrate(self.integrand_normalisation)
+        return self.get_closed_normalisation(self.temperature)
+
+    def get_closed_normalisation(self, temperature):
+        if self.dimension == 0:
+            return 1.0
+        return self.angular_volume * self.get_maxwell_integral(temperature)
+
+    def get_coefficients(self, temperatures, beam_energies):
+        return self.get_coefficients_with_error(temperatures, beam_energies)[0]
+
+    def get_coefficients_with_error(self, temperatures, beam_energies):
+        if self.method == 'quad':
+            return self.get_point_coefficients_with_error(temperatures, beam_energies)
+        if self.method == 'qmc' and self.dimension == 0:
+            raise ValueError('Batched coefficients need a Maxwellian speed grid, not the isotropic qmc sampling')
+        temperatures = numpy.asarray(temperatures, dtype=float).reshape(-1, 1)
+        beam_speeds = numpy.array([Beam(self.beam_species, e).get_speed() for e in beam_energies]).reshape(1, -1)
+        # the qmc samples always have (scramble, sample) axes
+        grid_axes = (numpy.newaxis,) * (2 if self.method == 'qmc' else max(self.dimension, 1))
+        batch = copy.copy(self)
+        batch.set_integrator(self.dimension, self.method)
+        if self.method == 'gauss':
+            batch.quadrature = self.quadrature
+        else:
+            batch.quasi_monte_carlo = self.quasi_monte_carlo
+        batch.temperature = temperatures[(Ellipsis,) + grid_axes]
+        batch.beam_speed = beam_speeds[(Ellipsis,) + grid_axes]
+        batch.maxwell_normalisation_factor = batch.get_maxwell_normalisation_factor(batch.temperature)
+        with instrumentation.time_stage('integrator/batch'):
+            value, error = batch.integrate_with_error(batch.integrand)
+        normalisation = self.get_closed_normalisation(temperatures)
+        shape = (temperatures.size, beam_speeds.size)
+        return numpy.broadcast_to(value / normalisation, shape).copy(),\
+            numpy.broadcast_to(error / normalisation, shape).copy()
+
+    def get_point_coefficients_with_error(self, temperatures, beam_energies):
+        # adaptive quad cannot be batched, so every grid point is integrated on its own
+        values = numpy.zeros((len(temperatures), len(beam_energies)))
+        errors = numpy.zeros_like(values)
+        for i, temperature in enumerate(temperatures):
+            for j, beam_energy in enumerate(beam_energies):
+                point = copy.copy(self)
+                point.temperature = temperature
+                point.beam_energy = beam_energy
+                point.beam_speed = point.get_projectile_velocity()
+                point.maxwell_normalisation_factor = point.get_maxwell_normalisation_factor(temperature)
+                point.set_integrator(self.dimension, self.method)
+                values[i, j], errors[i, j] = point.get_coefficient_with_error()
+        return values, errors
+
+    @staticmethod
+    def get_maxwell_integral(temperature):
+        return 1.0
+
+    @staticmethod
+    def get_speed_scale():
+        return 1.0
 
     @staticmethod
     def get_third_side_length(a, b, alpha, beta=0):
@@ -44,38 +172,193 @@ class RateIntegrator:
     def get_target_mass(self):
         if self.reaction_name == 'electron impact ionisation':
             return scipy.constants.electron_mass
-        elif self.reaction_name == 'charge exchange':
+        elif self.reaction_name in ['charge exchange', 'double charge exchange']:
             return Beam('D', 0).get_mass()
         else:
             raise ValueError('The ionisation reaction is unknown: ' + self.reaction_name)
 
     def get_cross_section(self):
+        return self.get_cross_section_function(self.get_cross_section_model())
+
+    def get_threshold_energy(self):
+        return self.get_cross_section_model().get_threshold()
+
+    def get_cross_section_model(self):
         if self.reaction_name == 'electron impact ionisation':
-            beb = BEBCrossSection(self.beam_species)
-            return beb.get_polynomial()
+            return BEBCrossSection(self.beam_species)
         elif self.reaction_name == 'charge exchange':
-            tabata = TabataCrossSection(self.beam_species)
-            return tabata.get_polynomial()
-            #tabata_double = TabataCrossSection(self.beam_species, degree='double')
-            #return lambda x: tabata.get_polynomial()(x) + 2.0 * tabata_double.get_polynomial()(x)
+            return TabataCrossSection(self.beam_species)
+        elif self.reaction_name == 'double charge exchange':
+            return TabataCrossSection(self.beam_species, degree='double')
         else:
             raise ValueError('The ionisation reaction is unknown: ' + self.reaction_name)
 
-    def set_integrator(self, dimension):
-        if dimension == 1:
+    def get_cross_section_function(self, cross_section):
+        if self.cross_section_method == 'polynomial':
+            return cross_section.get_polynomial()
+        elif self.cross_section_method == 'analytic':
+            return cross_section.get_function()
+        elif self.cross_section_method == 'table':
+            return cross_section.get_table()
+        else:
+            raise ValueError('Invalid cross section method: ' + str(self.cross_section_method))
+
+    def set_integrator(self, dimension, method='quad'):
+        if dimension == 0:
+            self.integrand = self.integrand_0d
+            self.integrand_normalisation = self.integrand_normalisation_0d
+            self.integrate = self.integrate_0d
+            self.integrate_with_error = self.integrate_with_error_0d
+            self.angular_volume = 1.0
+        elif dimension == 1:
             self.integrand = self.integrand_1d
             self.integrand_normalisation = self.integrand_normalisation_1d
             self.integrate = self.integrate_1d
+            self.integrate_with_error = self.integrate_with_error_1d
+            self.angular_volume = 1.0
         elif dimension == 2:
             self.integrand = self.integrand_2d
             self.integrand_normalisation = self.integrand_normalisation_2d
             self.integrate = self.integrate_2d
+            self.integrate_with_error = self.integrate_with_error_2d
+            self.angular_volume = 2.0 * numpy.pi
         elif dimension == 3:
             self.integrand = self.integrand_3d
             self.integrand_normalisation = self.integrand_normalisation_3d
             self.integrate = self.integrate_3d
+            self.integrate_with_error = self.integrate_with_error_3d
+            self.angular_volume = 2.0 * numpy.pi ** 2
         else:
             raise ValueError('Invalid integration dimension: ' + str(dimension))
+        if method == 'gauss':
+            self.quadrature = GaussQuadrature(laguerre_alpha=self.laguerre_alpha)
+            self.integrate = self.integrate_gauss
+            self.integrate_with_error = self.integrate_with_error_gauss
+        elif method == 'qmc':
+            self.quasi_monte_carlo = QuasiMonteCarlo()
+            self.integrate = self.integrate_qmc
+            self.integrate_with_error = self.integrate_with_error_qmc
+        elif method != 'quad':
+            raise ValueError('Invalid integration method: ' + str(method))
+        self.dimension = dimension
+        self.method = method
+
+    def integrate_gauss(self, function):
+        return self.integrate_with_error_gauss(function)[0]
+
+    def integrate_with_error_gauss(self, function):
+        if self.dimension == 0:
+            lower, centre, upper = self.get_isotropic_window()
+            lower_value, lower_error = self.quadrature.integrate_interval(function, lower, centre)
+            upper_value, upper_error = self.quadrature.integrate_interval(function, centre, upper)
+            return lower_value + upper_value, lower_error + upper_error
+        return self.quadrature.integrate(function, self.dimension, self.get_speed_scale())
+
+    def set_sample_budget(self, samples, scrambles=8):
+        if self.method != 'qmc':
+            raise ValueError('The sample budget needs the qmc method, not ' + str(self.method))
+        self.quasi_monte_carlo = QuasiMonteCarlo(samples, scrambles)
+
+    def set_distribution(self, distribution):
+        self.distribution = distribution
+
+    def get_distribution(self):
+        if self.distribution is None:
+            return Maxwellian(self.temperature, self.target_mass)
+        return self.distribution
+
+    @staticmethod
+    def get_speed_distribution():
+        return scipy.stats.maxwell()
+
+    def integrate_qmc(self, function):
+        return self.integrate_with_error_qmc(function)[0]
+
+    def integrate_with_error_qmc(self, function):
+        # the samples follow the normalisation weight, which leaves the mean of integrand / weight
+        normalisation = self.get_closed_normalisation(self.temperature)
+        value, error = self.quasi_monte_carlo.integrate(functools.partial(self.get_qmc_samples, function),
+                                                        3 if self.dimension == 0 else self.dimension)
+        return value * normalisation, error * normalisation
+
+    def get_qmc_samples(self, function, uniform):
+        nodes = self.get_qmc_nodes(uniform)
+        if self.dimension == 0:
+            # the nodes follow the target distribution itself, so the flux is averaged without any kernel
+            relative_speed = nodes[0]
+            return relative_speed * self.cross_section(self.get_impact_energy(relative_speed))
+        return function(*nodes) / self.integrand_normalisation(*nodes)
+
+    def get_qmc_nodes(self, uniform):
+        if self.dimension == 0:
+            # the beam flies along the last axis of the target velocity distribution
+            velocity = self.get_distribution().sample(uniform)
+            velocity[-1] -= self.beam_speed
+            return [numpy.sqrt(numpy.sum(velocity ** 2, axis=0))]
+        speed = self.get_speed_distribution().ppf(uniform[0])
+        if self.dimension == 1:
+            return [speed]
+        elif self.dimension == 2:
+            return [numpy.pi * (2.0 * uniform[1] - 1.0), speed]
+        return [0.5 * numpy.pi * (2.0 * uniform[2] - 1.0), numpy.pi * (2.0 * uniform[1] - 1.0), speed]
+
+    def get_speed_upper_bound(self):
+        # the flux weighted Maxwellian v^3 exp(-v^2/2) is the chi distribution with four degrees of freedom
+        return scipy.stats.chi.isf(self.tail_tolerance, 4)
+
+    def get_threshold_speed(self):
+        threshold_velocity = numpy.sqrt(2.0 * self.threshold_energy * scipy.constants.elementary_charge /
+                                        self.target_mass)
+        return threshold_velocity / self.maxwell_normalisation_factor
+
+    def get_scaled_function(self, function):
+        speed_scale = self.get_speed_scale()
+        if speed_scale == 1.0:
+            return function
+        return lambda *x: function(*x[:-1], x[-1] * speed_scale) * speed_scale
+
+    @staticmethod
+    def get_breakpoints(points, lower, upper):
+        return sorted(p for p in points if lower < p < upper)
+
+    def get_absolute_tolerance(self, function):
+        # QUADPACK tolerances are absolute, the coefficients are ~1e-13 m^3/s
+        if self.quad_tolerance is None:
+            return None
+        estimate = GaussQuadrature(laguerre_alpha=self.laguerre_alpha)\
+            .integrate(function, self.dimension, self.get_speed_scale())[0]
+        return self.quad_tolerance * numpy.abs(estimate)
+
+    @staticmethod
+    def get_tolerance_options(epsabs, volume=1.0):
+        return {} if epsabs is None else dict(epsabs=epsabs / volume, epsrel=0)
+
+    def get_speed_options(self, epsabs):
+        threshold_speed = self.get_threshold_speed()
+        beam_speed = self.beam_speed / self.maxwell_normalisation_factor
+        points = [threshold_speed, abs(beam_speed - threshold_speed), beam_speed + threshold_speed] \
+            if self.dimension > 1 else [threshold_speed]
+        return dict(points=self.get_breakpoints(points, 0, self.get_speed_upper_bound()),
+                    **self.get_tolerance_options(epsabs))
+
+    def get_angle_options(self, epsabs, volume, *outer_variables):
+        # the cross section switches on where the relative speed reaches the threshold speed
+        v = outer_variables[-1]
+        alpha = outer_variables[0] if len(outer_variables) > 1 else 0.0
+        beam_speed = self.beam_speed / self.maxwell_normalisation_factor
+        product = 2.0 * v * beam_speed * numpy.cos(alpha)
+        points = []
+        if product > 0:
+            cosine = (v ** 2 + beam_speed ** 2 - self.get_threshold_speed() ** 2) / product
+            if abs(cosine) < 1:
+                points = [-numpy.arccos(cosine), numpy.arccos(cosine)]
+        return dict(points=self.get_breakpoints(points, -numpy.pi, numpy.pi),
+                    **self.get_tolerance_options(epsabs, volume))
+
+    def get_isotropic_window(self):
+        centre = self.beam_speed / self.maxwell_normalisation_factor * self.get_speed_scale()
+        half_width = self.isotropic_half_width * self.get_speed_scale()
+        return numpy.maximum(centre - half_width, 0.0), centre, centre + half_width
 
     def integrand_all(self, v, alpha=0, beta=0):
         velocity = self.get_third_side_length(v * self.maxwell_normalisation_factor, self.beam_speed, alpha)
@@ -85,14 +368,44 @@ class RateIntegrator:
     def integrand_normalisation_all(self, v, alpha=0, beta=0):
         return self.maxwell(v)
 
+    # isotropic Maxwellian target: the angles are integrated analytically onto the relative speed w
+    def isotropic_kernel(self, w):
+        u = self.beam_speed / self.maxwell_normalisation_factor
+        return w / (u * numpy.sqrt(2.0 * numpy.pi)) * (numpy.exp(-0.5 * (w - u) ** 2) - numpy.exp(-0.5 * (w + u) ** 2))
+
+    def integrand_0d(self, w):
+        velocity = w * self.maxwell_normalisation_factor
+        impact_energy = self.get_impact_energy(velocity)
+        return self.isotropic_kernel(w) * velocity * self.cross_section(impact_energy)
+
+    def integrate_0d(self, function):
+        return self.integrate_with_error_0d(function)[0]
+
+    def integrate_with_error_0d(self, function):
+        lower, centre, upper = self.get_isotropic_window()
+        threshold_speed = self.get_threshold_speed() * self.get_speed_scale()
+        lower_value, lower_error = scipy.integrate.quad(function, lower, centre, epsabs=0, epsrel=1e-4,
+                                                        points=self.get_breakpoints([threshold_speed], lower,
+                                                                                    centre))[:2]
+        upper_value, upper_error = scipy.integrate.quad(function, centre, upper, epsabs=0, epsrel=1e-4,
+                                                        points=self.get_breakpoints([threshold_speed], centre,
+                                                                                    upper))[:2]
+        return lower_value + upper_value, lower_error + upper_error
+
+    def integrand_normalisation_0d(self, w):
+        return self.isotropic_kernel(w)
+
     def integrand_1d(self, v):
         velocity = v * self.maxwell_normalisation_factor
         impact_energy = self.get_impact_energy(velocity)
         return self.maxwell(v) * velocity * self.cross_section(impact_energy)
 
-    @staticmethod
-    def integrate_1d(function):
-        return scipy.integrate.quad(function, 0, numpy.inf)[0]
+    def integrate_1d(self, function):
+        return self.integrate_with_error_1d(function)[0]
+
+    def integrate_with_error_1d(self, function):
+        return scipy.integrate.quad(self.get_scaled_function(function), 0, self.get_speed_upper_bound(),
+                                    **self.get_speed_options(self.get_absolute_tolerance(function)))[:2]
 
     def integrand_normalisation_1d(self, v):
         return self.maxwell(v)
@@ -102,16 +415,30 @@ class RateIntegrator:
         impact_energy = self.get_impact_energy(velocity)
         return self.maxwell(v) * velocity * self.cross_section(impact_energy)
 
-    @staticmethod
-    def integrate_2d(function):
-        return scipy.integrate.dblquad(function, 0, numpy.inf, -numpy.pi, numpy.pi)[0]
+    def integrate_2d(self, function):
+        return self.integrate_with_error_2d(function)[0]
+
+    def integrate_with_error_2d(self, function):
+        epsabs = self.get_absolute_tolerance(function)
+        upper = self.get_speed_upper_bound()
+        return scipy.integrate.nquad(self.get_scaled_function(function), [[-numpy.pi, numpy.pi], [0, upper]],
+                                     opts=[functools.partial(self.get_angle_options, epsabs, upper),
+                                           self.get_speed_options(epsabs)])
 
     def integrand_normalisation_2d(self, alpha, v):
         return self.maxwell(v)
 
-    @staticmethod
-    def integrate_3d(function):
-        return scipy.integrate.tplquad(function, 0, numpy.inf, -numpy.pi, numpy.pi, -numpy.pi/2, numpy.pi/2)[0]
+    def integrate_3d(self, function):
+        return self.integrate_with_error_3d(function)[0]
+
+    def integrate_with_error_3d(self, function):
+        epsabs = self.get_absolute_tolerance(function)
+        upper = self.get_speed_upper_bound()
+        return scipy.integrate.nquad(self.get_scaled_function(function),
+                                     [[-numpy.pi / 2, numpy.pi / 2], [-numpy.pi, numpy.pi], [0, upper]],
+                                     opts=[functools.partial(self.get_angle_options, epsabs, 2.0 * numpy.pi * upper),
+                                           functools.partial(self.get_angle_options, epsabs, upper),
+                                           self.get_speed_options(epsabs)])
 
     def integrand_normalisation_3d(self, beta, alpha, v):
         return self.maxwell(v)
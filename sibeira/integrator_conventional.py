@@ -1,6 +1,5 @@
 import numpy
 import scipy.constants
-import scipy.integrate
 import scipy.stats
 
 from sibeira.integrator import RateIntegrator
@@ -12,9 +11,28 @@ def maxwell(m, T, v):
 
 
 class RateIntegratorConventional(RateIntegrator):
+    laguerre_alpha = -0.5
+
     def maxwell(self, velocity):
         return maxwell(self.target_mass, self.temperature, velocity)
 
+    def get_maxwell_integral(self, temperature):
+        m__2kT = self.target_mass / (2.0 * temperature * scipy.constants.elementary_charge)
+        return m__2kT / (2.0 * numpy.pi)
+
+    def get_speed_scale(self):
+        return self.maxwell_normalisation_factor
+
+    def get_speed_distribution(self):
+        return scipy.stats.halfnorm(scale=self.maxwell_normalisation_factor)
+
+    def isotropic_kernel(self, velocity):
+        return super().isotropic_kernel(velocity / self.maxwell_normalisation_factor) / self.maxwell_normalisation_factor
+
+    def integrand_0d(self, velocity):
+        impact_energy = self.get_impact_energy(velocity)
+        return self.isotropic_kernel(velocity) * velocity * self.cross_section(impact_energy)
+
     def integrand_1d(self, velocity):
         impact_energy = self.get_impact_energy(velocity)
         return self.maxwell(velocity) * velocity * self.cross_section(impact_energy)
@@ -0,0 +1,67 @@
+import collections
+import numpy
+
+from sibeira.integrator import RateIntegrator
+
+
+def get_reaction_term(reaction_name, beam_species, weight=1.0, dimension=2, cross_section_method='polynomial'):
+    integrator = RateIntegrator(reaction_name, beam_species, 0.0, 1.0, dimension, 'gauss', cross_section_method)
+    return reaction_name, integrator.cross_section, integrator.target_mass, weight, dimension
+
+
+class SharedNodeIntegrator(RateIntegrator):
+    def __init__(self, cross_sections, target_mass, beam_species, beam_energy, temperature, dimension=2,
+                 method='gauss'):
+        self.cross_sections = cross_sections
+        self.shared_target_mass = target_mass
+        super().__init__('shared nodes', beam_species, beam_energy, temperature, dimension, method)
+
+    def get_target_mass(self):
+        return self.shared_target_mass
+
+    def get_cross_section(self):
+        # the channels are stacked along a leading axis, so the quadrature sums every channel in one pass
+        return lambda energy: numpy.stack([cross_section(energy) for cross_section in self.cross_sections])
+
+    def get_threshold_energy(self):
+        return 0.0
+
+    def get_description(self):
+        raise ValueError('The shared node integrator has no cacheable description')
+
+
+class MultiReactionIntegrator:
+    def __init__(self, beam_species, beam_energy, temperature, terms, method='gauss'):
+        if method not in ['gauss', 'qmc']:
+            raise ValueError('The multi-reaction integrator needs a vectorised method, not ' + str(method))
+        self.terms = [tuple(term) for term in terms]
+        self.reaction_names = [term[0] for term in self.terms]
+        if len(set(self.reaction_names)) != len(self.reaction_names):
+            raise ValueError('The reaction names are not unique: ' + str(self.reaction_names))
+        self.weights = numpy.array([term[3] for term in self.terms], dtype=float)
+        groups = collections.OrderedDict()
+        for index, (reaction_name, cross_section, target_mass, weight, dimension) in enumerate(self.terms):
+            groups.setdefault((target_mass, dimension), []).append(index)
+        self.integrators = []
+        for (target_mass, dimension), indices in groups.items():
+            integrator = SharedNodeIntegrator([self.terms[index][1] for index in indices], target_mass,
+                                              beam_species, beam_energy, temperature, dimension, method)
+            self.integrators.append((integrator, indices))
+
+    def get_channel_coefficients_with_error(self):
+        values = numpy.zeros(len(self.terms))
+        errors = numpy.zeros(len(self.terms))
+        for integrator, indices in self.integrators:
+            values[indices], errors[indices] = integrator.get_coefficient_with_error()
+        return values, errors
+
+    def get_channel_coefficients(self):
+        values = self.get_channel_coefficients_with_error()[0]
+        return collections.OrderedDict(zip(self.reaction_names, values))
+
+    def get_coefficient_with_error(self):
+        values, errors = self.get_channel_coefficients_with_error()
+        return numpy.sum(self.weights * values), numpy.sum(numpy.abs(self.weights) * errors)
+
+    def get_coefficient(self):
+        return self.get_coefficient_with_error()[0]
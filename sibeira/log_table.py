@@ -0,0 +1,16 @@
+import numpy
+
+
+class LogTable:
+    def __init__(self, function, minimum, maximum, size=4096):
+        self.log_minimum = numpy.log(minimum)
+        self.step = (numpy.log(maximum) - self.log_minimum) / (size - 1)
+        self.minimum = minimum
+        self.values = function(numpy.exp(self.log_minimum + self.step * numpy.arange(size)))
+
+    def __call__(self, energy):
+        position = (numpy.log(numpy.maximum(energy, self.minimum)) - self.log_minimum) / self.step
+        position = numpy.minimum(position, self.values.size - 1)
+        index = numpy.minimum(position.astype(int), self.values.size - 2)
+        fraction = position - index
+        return (1.0 - fraction) * self.values[index] + fraction * self.values[index + 1]
@@ -0,0 +1,124 @@
+import argparse
+import concurrent.futures
+import sys
+
+from sibeira.rate_profile import RateProfile
+from sibeira.rate_profile_io import RateProfileIO
+
+default_species = ['Li', 'Na', 'K', 'Rb', 'Cs']
+default_beam_energies = [20., 30., 40., 50., 60., 70., 80.]
+default_models = ['nrl', 'beb', 'tabata']
+default_dimensions = [-1, 0, 2]
+
+
+def get_entries(species, beam_energies, models, dimensions):
+    return [(s, 1000.0 * beam_energy, model, dimension)
+            for s in species for beam_energy in beam_energies for model in models for dimension in dimensions
+            if model != 'tabata' or dimension >= 0]
+
+
+def get_rate_profile(species, beam_energy, profile_storage='pickle', integration_method='quad',
+                     double_charge_exchange=False):
+    r = RateProfile(species, beam_energy)
+    r.set_profile_storage(profile_storage)
+    r.set_integration_method(integration_method)
+    r.set_double_charge_exchange(double_charge_exchange)
+    r.set_progress_callback(None)
+    return r
+
+
+def is_stored(entry, destination_directory, profile_storage='pickle', double_charge_exchange=False):
+    species, beam_energy, model, dimension = entry
+    r = get_rate_profile(species, beam_energy, profile_storage, double_charge_exchange=double_charge_exchange)
+    try:
+        r.import_profile(model, dimension, destination_directory)
+    except (FileNotFoundError, EOFError, KeyError):
+        return False
+    return True
+
+
+def get_missing_entries(entries, destination_directory, profile_storage='pickle', double_charge_exchange=False):
+    return [entry for entry in entries
+            if not is_stored(entry, destination_directory, profile_storage, double_charge_exchange)]
+
+
+def compute_entry(entry, integration_method='quad', double_charge_exchange=False, refinement_tolerance=None):
+    species, beam_energy, model, dimension = entry
+    r = get_rate_profile(species, beam_energy, integration_method=integration_method,
+                         double_charge_exchange=double_charge_exchange)
+    if refinement_tolerance is not None:
+        r.set_refinement_tolerance(refinement_tolerance)
+    return r.get_reference_profile(model, dimension)
+
+
+def store_entry(entry, profile, destination_directory, profile_storage='pickle', double_charge_exchange=False):
+    species, beam_energy, model, dimension = entry
+    r = get_rate_profile(species, beam_energy, profile_storage, double_charge_exchange=double_charge_exchange)
+    r.export_profile(model, dimension, profile, destination_directory)
+
+
+def get_entry_label(entry):
+    species, beam_energy, model, dimension = entry
+    return species + ' ' + str(beam_energy / 1000.) + ' keV ' + model + \
+        (' (Tabata ' + str(dimension) + 'D)' if dimension >= 0 else '')
+
+
+def precompute(entries, destination_directory, profile_storage='pickle', integration_method='quad',
+               double_charge_exchange=False, refinement_tolerance=None, workers=None):
+    failed = []
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        futures = {executor.submit(compute_entry, entry, integration_method, double_charge_exchange,
+                                   refinement_tolerance): entry for entry in entries}
+        try:
+            for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                entry = futures[future]
+                try:
+                    profile = future.result()
+                except Exception as error:
+                    failed.append(entry)
+                    print('[' + str(i + 1) + '/' + str(len(entries)) + '] ' + get_entry_label(entry) +
+                          ' failed: ' + repr(error))
+                    continue
+                # every completed entry is written at once, so an interrupted run resumes from here
+                store_entry(entry, profile, destination_directory, profile_storage, double_charge_exchange)
+                print('[' + str(i + 1) + '/' + str(len(entries)) + '] ' + get_entry_label(entry))
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            raise
+    return failed
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Precompute the SIBEIRA rate profile databases.')
+    parser.add_argument('--species', nargs='+', default=default_species)
+    parser.add_argument('--beam-energies', nargs='+', type=float, default=default_beam_energies, help='in keV')
+    parser.add_argument('--models', nargs='+', default=default_models, choices=default_models)
+    parser.add_argument('--dimensions', nargs='+', type=int, default=default_dimensions,
+                        help='Tabata integration dimensions, -1 switches charge exchange off')
+    parser.add_argument('--destination', default=RateProfileIO.default_destination_directory)
+    parser.add_argument('--storage', default='pickle', choices=['pickle', 'columnar'])
+    parser.add_argument('--integration-method', default='quad', choices=['quad', 'gauss', 'qmc'])
+    parser.add_argument('--double-charge-exchange', action='store_true')
+    parser.add_argument('--refinement-tolerance', type=float)
+    parser.add_argument('--workers', type=int, help='size of the process pool (all cores by default)')
+    parser.add_argument('--dry-run', action='store_true', help='only list the missing profiles')
+    arguments = parser.parse_args(arguments)
+
+    entries = get_entries(arguments.species, arguments.beam_energies, arguments.models, arguments.dimensions)
+    missing_entries = get_missing_entries(entries, arguments.destination, arguments.storage,
+                                          arguments.double_charge_exchange)
+    print(str(len(missing_entries)) + ' of ' + str(len(entries)) + ' profiles are missing')
+    if arguments.dry_run:
+        for entry in missing_entries:
+            print(get_entry_label(entry))
+        return 0
+    if not missing_entries:
+        return 0
+    failed = precompute(missing_entries, arguments.destination, arguments.storage, arguments.integration_method,
+                        arguments.double_charge_exchange, arguments.refinement_tolerance, arguments.workers)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import functools
+import numpy
+import scipy.special
+import scipy.stats
+
+
+@functools.lru_cache()
+def get_laguerre_nodes(order, alpha):
+    # v = sqrt(2x) maps the Maxwellian exp(-v^2/2) onto the Laguerre weight exp(-x)
+    x, w = scipy.special.roots_genlaguerre(order, alpha)
+    speed = numpy.sqrt(2.0 * x)
+    weight = numpy.exp(numpy.log(w) + x - (alpha + 0.5) * numpy.log(x)) / numpy.sqrt(2.0)
+    return read_only(speed), read_only(weight)
+
+
+@functools.lru_cache()
+def get_legendre_nodes(order, upper):
+    # the integrands are even in the angles, so [-upper, upper] is folded onto [0, upper]
+    x, w = scipy.special.roots_legendre(order)
+    return read_only(0.5 * upper * (x + 1.0)), read_only(upper * w)
+
+
+def read_only(a):
+    a.flags.writeable = False
+    return a
+
+
+class GaussQuadrature:
+    def __init__(self, speed_order=48, angle_order=16, laguerre_alpha=0.5):
+        self.speed_order = speed_order
+        self.angle_order = angle_order
+        self.laguerre_alpha = laguerre_alpha
+
+    def integrate(self, function, dimension, speed_scale=1.0):
+        value = self.integrate_on_grid(function, dimension, speed_scale, self.speed_order, self.angle_order)
+        coarse_value = self.integrate_on_grid(function, dimension, speed_scale,
+                                              self.speed_order // 2, self.angle_order // 2)
+        return value, numpy.abs(value - coarse_value)
+
+    def integrate_interval(self, function, lower, upper):
+        value = self.integrate_interval_on_grid(function, lower, upper, self.speed_order)
+        coarse_value = self.integrate_interval_on_grid(function, lower, upper, self.speed_order // 2)
+        return value, numpy.abs(value - coarse_value)
+
+    @staticmethod
+    def integrate_interval_on_grid(function, lower, upper, order):
+        x, w = get_legendre_nodes(order, 1.0)
+        half_width = 0.5 * (upper - lower)
+        return numpy.sum(function(lower + 2.0 * half_width * x) * half_width * w, axis=-1)
+
+    def integrate_on_grid(self, function, dimension, speed_scale, speed_order, angle_order):
+        nodes, weights = self.get_grid(dimension, speed_order, angle_order)
+        nodes[-1] = speed_scale * nodes[-1]
+        weights = speed_scale * weights
+        return numpy.sum(function(*nodes) * weights, axis=tuple(range(-dimension, 0)))
+
+    def get_grid(self, dimension, speed_order, angle_order):
+        speed, speed_weight = get_laguerre_nodes(speed_order, self.laguerre_alpha)
+        if dimension == 1:
+            return [speed], speed_weight
+        alpha, alpha_weight = get_legendre_nodes(angle_order, numpy.pi)
+        if dimension == 2:
+            return [alpha[numpy.newaxis, :], speed[:, numpy.newaxis]], numpy.outer(speed_weight, alpha_weight)
+        elif dimension == 3:
+            beta, beta_weight = get_legendre_nodes(angle_order, numpy.pi / 2)
+            return [beta[numpy.newaxis, numpy.newaxis, :], alpha[numpy.newaxis, :, numpy.newaxis],
+                    speed[:, numpy.newaxis, numpy.newaxis]],\
+                numpy.einsum('i,j,k->ijk', speed_weight, alpha_weight, beta_weight)
+        else:
+            raise ValueError('Invalid integration dimension: ' + str(dimension))
+
+
+class QuasiMonteCarlo:
+    def __init__(self, samples=2 ** 14, scrambles=8, sequence='sobol', seed=0, confidence=0.95):
+        if sequence not in ['sobol', 'halton']:
+            raise ValueError('Invalid QMC sequence: ' + str(sequence))
+        if scrambles < 2:
+            raise ValueError('At least two scrambles are needed for a confidence interval: ' + str(scrambles))
+        self.samples = samples
+        self.scrambles = scrambles
+        self.sequence = sequence
+        self.seed = seed
+        self.confidence = confidence
+        self.points = {}
+
+    def integrate(self, function, dimension):
+        estimates = numpy.mean(function(self.get_points(dimension)), axis=-1)
+        value = numpy.mean(estimates, axis=-1)
+        error = scipy.stats.t.ppf(0.5 + 0.5 * self.confidence, self.scrambles - 1) * \
+            numpy.std(estimates, axis=-1, ddof=1) / numpy.sqrt(self.scrambles)
+        return value, error
+
+    def get_points(self, dimension):
+        if dimension not in self.points:
+            generator = numpy.random.default_rng(self.seed)
+            size = self.samples // self.scrambles
+            points = []
+            for _ in range(self.scrambles):
+                if self.sequence == 'sobol':
+                    engine = scipy.stats.qmc.Sobol(dimension, scramble=True, seed=generator)
+                    points.append(engine.random_base2(int(numpy.log2(size))))
+                else:
+                    engine = scipy.stats.qmc.Halton(dimension, scramble=True, seed=generator)
+                    points.append(engine.random(size))
+            # the inverse CDFs diverge at the ends of the unit interval
+            points = numpy.clip(numpy.array(points), 2.0 ** -53, 1.0 - 2.0 ** -53)
+            self.points[dimension] = read_only(numpy.moveaxis(points, -1, 0))
+        return self.points[dimension]
@@ -1,36 +1,110 @@
 import numpy
 
 from sibeira.beam import Beam
-from nrl.rate import get_nrl_rate
-from sibeira.integrator import RateIntegrator
 
 
 class Rate(Beam):
+    double_charge_exchange_weight = 2.0
+
     def __init__(self, species, beam_energy, ionisation_level=0):
         super().__init__(species, beam_energy, ionisation_level)
+        self.integration_method = 'quad'
+        self.double_charge_exchange = False
 
     def set_profiles(self, electron_temperature=numpy.nan):
         if ~numpy.isnan(electron_temperature):
             self.electron_temperature = electron_temperature
 
+    def set_integration_method(self, integration_method):
+        self.integration_method = integration_method
+
+    def set_double_charge_exchange(self, double_charge_exchange=True):
+        self.double_charge_exchange = double_charge_exchange
+
+    def get_charge_exchange_channels(self, tabata_integration_dimension):
+        if tabata_integration_dimension < 0:
+            return []
+        channels = [('charge exchange', 1.0, tabata_integration_dimension)]
+        if self.double_charge_exchange:
+            channels.append(('double charge exchange', self.double_charge_exchange_weight,
+                             tabata_integration_dimension))
+        return channels
+
+    def get_channel_rate(self, channels):
+        from sibeira.integrator import RateIntegrator
+        from sibeira.integrator_multi import MultiReactionIntegrator, get_reaction_term
+        if len(channels) == 0:
+            return 0.0
+        if self.integration_method == 'quad':
+            return sum(weight * RateIntegrator(reaction_name, self.species, self.beam_energy,
+                                               self.electron_temperature, dimension, self.integration_method)
+                       .get_coefficient() for reaction_name, weight, dimension in channels)
+        terms = [get_reaction_term(reaction_name, self.species, weight, dimension)
+                 for reaction_name, weight, dimension in channels]
+        return MultiReactionIntegrator(self.species, self.beam_energy, self.electron_temperature, terms,
+                                       self.integration_method).get_coefficient()
+
     def get_full_rate_with_nrl(self, tabata_integration_dimension=-1):
+        from nrl.rate import get_nrl_rate
         r = get_nrl_rate(self.species, self.ionisation_level, self.electron_temperature)
+        return r + self.get_channel_rate(self.get_charge_exchange_channels(tabata_integration_dimension))
+
+    def get_full_rate_with_beb(self, tabata_integration_dimension=-1):
+        return self.get_channel_rate([('electron impact ionisation', 1.0, 1)] +
+                                     self.get_charge_exchange_channels(tabata_integration_dimension))
+
+    def get_full_rate_with_tabata(self, tabata_integration_dimension=2):
+        return self.get_channel_rate(self.get_charge_exchange_channels(tabata_integration_dimension))
+
+    def get_full_rates_with_nrl(self, electron_temperatures, tabata_integration_dimension=-1):
+        from nrl.rate import get_nrl_rate
+        r = get_nrl_rate(self.species, self.ionisation_level, numpy.asarray(electron_temperatures, dtype=float))
         if tabata_integration_dimension >= 0:
-            r += RateIntegrator('charge exchange',
-                                self.species, self.beam_energy, self.electron_temperature, tabata_integration_dimension)\
-                .get_coefficient()
+            r = r + self.get_charge_exchange_rates(electron_temperatures, tabata_integration_dimension)
         return r
 
-    def get_full_rate_with_beb(self, tabata_integration_dimension=-1):
-        r = RateIntegrator('electron impact ionisation', self.species, self.beam_energy, self.electron_temperature, 1)\
-            .get_coefficient()
+    def get_full_rates_with_beb(self, electron_temperatures, tabata_integration_dimension=-1):
+        r = self.get_rates('electron impact ionisation', electron_temperatures, 1)
         if tabata_integration_dimension >= 0:
-            r += RateIntegrator('charge exchange',
-                                self.species, self.beam_energy, self.electron_temperature, tabata_integration_dimension)\
-                .get_coefficient()
+            r = r + self.get_charge_exchange_rates(electron_temperatures, tabata_integration_dimension)
         return r
 
-    def get_full_rate_with_tabata(self, tabata_integration_dimension=2):
-        return RateIntegrator('charge exchange',
-                              self.species, self.beam_energy, self.electron_temperature, tabata_integration_dimension)\
-            .get_coefficient()
+    def get_full_rates_with_tabata(self, electron_temperatures, tabata_integration_dimension=2):
+        return self.get_charge_exchange_rates(electron_temperatures, tabata_integration_dimension)
+
+    def get_full_rate_grid_with_nrl(self, electron_temperatures, beam_energies, tabata_integration_dimension=-1):
+        from nrl.rate import get_nrl_rate
+        r = get_nrl_rate(self.species, self.ionisation_level, numpy.asarray(electron_temperatures, dtype=float))
+        r = numpy.outer(r, numpy.ones(len(beam_energies)))
+        if tabata_integration_dimension >= 0:
+            r = r + self.get_charge_exchange_rate_grid(electron_temperatures, beam_energies,
+                                                       tabata_integration_dimension)
+        return r
+
+    def get_full_rate_grid_with_beb(self, electron_temperatures, beam_energies, tabata_integration_dimension=-1):
+        r = self.get_rate_grid('electron impact ionisation', electron_temperatures, beam_energies, 1)
+        if tabata_integration_dimension >= 0:
+            r = r + self.get_charge_exchange_rate_grid(electron_temperatures, beam_energies,
+                                                       tabata_integration_dimension)
+        return r
+
+    def get_full_rate_grid_with_tabata(self, electron_temperatures, beam_energies, tabata_integration_dimension=2):
+        return self.get_charge_exchange_rate_grid(electron_temperatures, beam_energies, tabata_integration_dimension)
+
+    def get_charge_exchange_rates(self, electron_temperatures, tabata_integration_dimension):
+        return self.get_charge_exchange_rate_grid(electron_temperatures, [self.beam_energy],
+                                                  tabata_integration_dimension)[:, 0]
+
+    def get_charge_exchange_rate_grid(self, electron_temperatures, beam_energies, tabata_integration_dimension):
+        return sum(weight * self.get_rate_grid(reaction_name, electron_temperatures, beam_energies, dimension)
+                   for reaction_name, weight, dimension in
+                   self.get_charge_exchange_channels(tabata_integration_dimension))
+
+    def get_rates(self, reaction_name, electron_temperatures, dimension):
+        return self.get_rate_grid(reaction_name, electron_temperatures, [self.beam_energy], dimension)[:, 0]
+
+    def get_rate_grid(self, reaction_name, electron_temperatures, beam_energies, dimension):
+        from sibeira.integrator import RateIntegrator
+        return RateIntegrator(reaction_name, self.species, self.beam_energy, electron_temperatures[0], dimension,
+                              self.integration_method)\
+            .get_coefficients(electron_temperatures, beam_energies)
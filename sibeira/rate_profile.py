@@ -1,84 +1,392 @@
+import functools
 import numpy
-import scipy.interpolate
-import scipy.integrate
 
+from sibeira import instrumentation
+from sibeira.rate import Rate
 from sibeira.rate_profile_io import RateProfileIO
 
 
+def get_reference_rate(species, beam_energy, ionisation_level, integration_method, profile_name,
+                       tabata_integration_dimension, double_charge_exchange, electron_temperature):
+    r = Rate(species, beam_energy, ionisation_level)
+    r.set_integration_method(integration_method)
+    r.set_double_charge_exchange(double_charge_exchange)
+    r.set_profiles(electron_temperature)
+    return getattr(r, 'get_full_rate_with_' + profile_name)(tabata_integration_dimension)
+
+
+def get_cumulative_trapezoid(y, x):
+    # numpy only: attenuation from stored profiles must not pay for importing scipy.integrate
+    steps = 0.5 * (y[..., 1:] + y[..., :-1]) * numpy.diff(x, axis=-1)
+    return numpy.concatenate([numpy.zeros(steps.shape[:-1] + (1,)), numpy.cumsum(steps, axis=-1)], axis=-1)
+
+
+def get_trapezoid_weights(x):
+    # the cumulative trapezoid up to point i weighs y_k (k <= i) by lower_k, and again by upper_k if k < i
+    half_steps = 0.5 * numpy.diff(x)
+    return numpy.concatenate([[0.0], half_steps]), numpy.concatenate([half_steps, [0.0]])
+
+
+def get_cumulative_trapezoid_jacobian(x):
+    lower_weights, upper_weights = get_trapezoid_weights(x)
+    is_lower = numpy.tri(len(x), dtype=bool)
+    return is_lower * lower_weights + numpy.tri(len(x), k=-1, dtype=bool) * upper_weights
+
+
+def get_cumulative_trapezoid_vjp(u, x):
+    lower_weights, upper_weights = get_trapezoid_weights(x)
+    tail_sums = numpy.flip(numpy.cumsum(numpy.flip(u, axis=-1), axis=-1), axis=-1)
+    return lower_weights * tail_sums + upper_weights * (tail_sums - u)
+
+
 class RateProfile(RateProfileIO):
+    profile_labels = {'nrl': 'NRL', 'beb': 'BEB', 'tabata': 'Tabata'}
+    log_derivative_step = 1e-5
+
     def __init__(self, species, beam_energy, ionisation_level=0):
         super().__init__(species, beam_energy, ionisation_level)
         self.reference_energies = [10., 20., 50., 100., 200., 500., 1000.]
         self.nrl_spline = None
         self.beb_spline = None
         self.tabata_spline = None
+        self.rate_table = None
+        self.shared_rate_tables = None
+        self.refinement_tolerance = None
+        self.maximum_reference_size = 64
+        self.progress_callback = instrumentation.print_progress
 
     @staticmethod
     def resolve_log_spline(f, x):
         if numpy.isscalar(x):
-            return 0 if x == 0 else numpy.exp(f(numpy.log(x)))
-        return [0. if i == 0 else numpy.exp(f(numpy.log(i))) for i in x]
+            return 0 if x <= 0 else numpy.exp(f(numpy.log(x)))
+        x = numpy.asarray(x, dtype=float)
+        is_resolved = ~(x <= 0)
+        y = numpy.zeros_like(x)
+        y[is_resolved] = numpy.exp(f(numpy.log(x[is_resolved])))
+        return y
 
-    @staticmethod
-    def get_spline(energy, cross_section):
-        return scipy.interpolate.interp1d(numpy.log(energy), numpy.log(cross_section),
-                                          kind='cubic', fill_value='extrapolate')
+    @classmethod
+    def resolve_log_spline_with_derivative(cls, f, x):
+        x = numpy.asarray(x, dtype=float)
+        is_resolved = ~(x <= 0)
+        y = numpy.zeros_like(x)
+        dy_dx = numpy.zeros_like(x)
+        log_x = numpy.log(x[is_resolved])
+        y[is_resolved] = numpy.exp(f(log_x))
+        # central difference of the log-log profile, exact up to O(step^2) for any smooth profile callable
+        slope = (f(log_x + cls.log_derivative_step) - f(log_x - cls.log_derivative_step)) / \
+            (2.0 * cls.log_derivative_step)
+        dy_dx[is_resolved] = y[is_resolved] * slope / x[is_resolved]
+        return y, dy_dx
 
     def set_reference_energies(self, reference_energies):
         self.reference_energies = reference_energies
 
-    def set_nrl_profile(self, tabata_integration_dimension=-1):
-        reference_rates = numpy.zeros_like(self.reference_energies, dtype=float)
-        for i in range(len(reference_rates)):
-            print('NRL  ' + str(int(i / len(reference_rates) * 100)) + '%', end='\r')
-            self.set_profiles(self.reference_energies[i])
-            reference_rates[i] = self.get_full_rate_with_nrl(tabata_integration_dimension)
-        print('NRL 100%')
-        self.nrl_spline = self.get_spline(self.reference_energies, reference_rates)
-
-    def get_nrl_profile(self, tabata_integration_dimension=-1):
-        self.set_nrl_profile(tabata_integration_dimension)
+    def set_progress_callback(self, progress_callback):
+        self.progress_callback = progress_callback
+
+    def report_progress(self, label, completed, total):
+        if self.progress_callback is not None:
+            self.progress_callback(label, completed, total)
+
+    def set_rate_table(self, rate_table):
+        if rate_table is not None:
+            rate_table.check_beam_energy(self.beam_energy)
+        self.rate_table = rate_table
+
+    def set_shared_rate_tables(self, shared_rate_tables):
+        self.shared_rate_tables = shared_rate_tables
+
+    def set_refinement_tolerance(self, refinement_tolerance, maximum_reference_size=64):
+        self.refinement_tolerance = refinement_tolerance
+        self.maximum_reference_size = maximum_reference_size
+
+    def get_reference_rates(self, profile_name, tabata_integration_dimension, executor=None,
+                            electron_temperatures=None):
+        if electron_temperatures is None:
+            electron_temperatures = self.reference_energies
+        label = self.profile_labels[profile_name]
+        reference_rates = numpy.zeros_like(electron_temperatures, dtype=float)
+        with instrumentation.time_stage('profile/reference_rates'):
+            if executor is None and self.integration_method == 'gauss':
+                reference_rates[:] = getattr(self, 'get_full_rates_with_' + profile_name)(
+                    electron_temperatures, tabata_integration_dimension)
+            else:
+                rates = self.iterate_reference_rates(profile_name, tabata_integration_dimension, executor,
+                                                     electron_temperatures)
+                for i, rate in enumerate(rates):
+                    reference_rates[i] = rate
+                    if i + 1 < len(reference_rates):
+                        self.report_progress(label, i + 1, len(reference_rates))
+        instrumentation.count('profile/reference_rates/points', len(reference_rates))
+        self.report_progress(label, len(reference_rates), len(reference_rates))
+        return reference_rates
+
+    def iterate_reference_rates(self, profile_name, tabata_integration_dimension, executor=None,
+                                electron_temperatures=None):
+        if electron_temperatures is None:
+            electron_temperatures = self.reference_energies
+        if executor is None:
+            for electron_temperature in electron_temperatures:
+                self.set_profiles(electron_temperature)
+                yield getattr(self, 'get_full_rate_with_' + profile_name)(tabata_integration_dimension)
+        else:
+            yield from executor.map(functools.partial(get_reference_rate, self.species, self.beam_energy,
+                                                      self.ionisation_level, self.integration_method, profile_name,
+                                                      tabata_integration_dimension, self.double_charge_exchange),
+                                    electron_temperatures)
+
+    def get_reference_profile(self, profile_name, tabata_integration_dimension, executor=None):
+        with instrumentation.time_stage('profile/' + profile_name):
+            reference_rates = self.get_reference_rates(profile_name, tabata_integration_dimension, executor)
+            if self.refinement_tolerance is None:
+                return self.get_spline(self.reference_energies, reference_rates)
+            return self.get_refined_profile(profile_name, tabata_integration_dimension, reference_rates, executor)
+
+    def get_refined_profile(self, profile_name, tabata_integration_dimension, reference_rates, executor=None):
+        temperatures = numpy.asarray(self.reference_energies, dtype=float)
+        rates = numpy.asarray(reference_rates, dtype=float)
+        midpoint_rates = numpy.full(temperatures.size - 1, numpy.nan)
+        while True:
+            midpoints = numpy.sqrt(temperatures[1:] * temperatures[:-1])
+            is_open = numpy.isnan(midpoint_rates)
+            if is_open.any():
+                midpoint_rates[is_open] = self.get_reference_rates(profile_name, tabata_integration_dimension,
+                                                                   executor, midpoints[is_open])
+            # every insertion changes the whole cubic spline, so every known midpoint is checked again
+            spline = self.get_spline(temperatures, rates)
+            errors = numpy.abs(self.resolve_log_spline(spline, midpoints) / midpoint_rates - 1.0)
+            index = numpy.flatnonzero(errors > self.refinement_tolerance)
+            available_size = self.maximum_reference_size - temperatures.size
+            if index.size == 0 or available_size <= 0:
+                break
+            index = numpy.sort(index[numpy.argsort(-errors[index], kind='stable')[:available_size]])
+            temperatures = numpy.insert(temperatures, index + 1, midpoints[index])
+            rates = numpy.insert(rates, index + 1, midpoint_rates[index])
+            is_refined = numpy.zeros(midpoints.size, dtype=bool)
+            is_refined[index] = True
+            midpoint_rates = numpy.repeat(numpy.where(is_refined, numpy.nan, midpoint_rates),
+                                          numpy.where(is_refined, 2, 1))
+        spline.error = float(numpy.max(errors))
+        return spline
+
+    def set_nrl_profile(self, tabata_integration_dimension=-1, executor=None):
+        self.nrl_spline = self.get_reference_profile('nrl', tabata_integration_dimension, executor)
+
+    def get_nrl_profile(self, tabata_integration_dimension=-1, executor=None):
+        self.set_nrl_profile(tabata_integration_dimension, executor)
         return self.nrl_spline
 
-    def set_beb_profile(self, tabata_integration_dimension=-1):
-        reference_rates = numpy.zeros_like(self.reference_energies, dtype=float)
-        for i in range(len(reference_rates)):
-            print('BEB  ' + str(int(i / len(reference_rates) * 100)) + '%', end='\r')
-            self.set_profiles(self.reference_energies[i])
-            reference_rates[i] = self.get_full_rate_with_beb(tabata_integration_dimension)
-        print('BEB 100%')
-        self.beb_spline = self.get_spline(self.reference_energies, reference_rates)
-
-    def get_beb_profile(self, tabata_integration_dimension=-1):
-        self.set_beb_profile(tabata_integration_dimension)
+    def set_beb_profile(self, tabata_integration_dimension=-1, executor=None):
+        self.beb_spline = self.get_reference_profile('beb', tabata_integration_dimension, executor)
+
+    def get_beb_profile(self, tabata_integration_dimension=-1, executor=None):
+        self.set_beb_profile(tabata_integration_dimension, executor)
         return self.beb_spline
 
-    def set_tabata_profile(self, tabata_integration_dimension=2):
-        reference_rates = numpy.zeros_like(self.reference_energies, dtype=float)
-        for i in range(len(reference_rates)):
-            print('Tabata  ' + str(int(i / len(reference_rates) * 100)) + '%', end='\r')
-            self.set_profiles(self.reference_energies[i])
-            reference_rates[i] = self.get_full_rate_with_tabata(tabata_integration_dimension)
-        print('Tabata 100%')
-        self.tabata_spline = self.get_spline(self.reference_energies, reference_rates)
-
-    def get_tabata_profile(self, tabata_integration_dimension=2):
-        self.set_tabata_profile(tabata_integration_dimension)
+    def set_tabata_profile(self, tabata_integration_dimension=2, executor=None):
+        self.tabata_spline = self.get_reference_profile('tabata', tabata_integration_dimension, executor)
+
+    def get_tabata_profile(self, tabata_integration_dimension=2, executor=None):
+        self.set_tabata_profile(tabata_integration_dimension, executor)
         return self.tabata_spline
 
-    def get_attenuation(self, radial_coordinates, temperatures, densities, profile_name,
-                        tabata_integration_dimension=-1):
+    def get_profile(self, profile_name, tabata_integration_dimension=-1, executor=None):
+        if self.rate_table is not None and not self.double_charge_exchange and \
+                self.rate_table.is_matching(self.species, self.ionisation_level, profile_name,
+                                            tabata_integration_dimension):
+            return self.rate_table.get_profile(self.beam_energy)
+        if self.shared_rate_tables is not None:
+            profile = self.shared_rate_tables.find_profile(self.species, self.get_beam_energy_as_string(), profile_name,
+                                                           self.get_dimension_as_string(tabata_integration_dimension))
+            if profile is not None:
+                return profile
         try:
             profile = self.import_profile(profile_name, tabata_integration_dimension)
         except (FileNotFoundError, EOFError, KeyError):
             if profile_name == 'beb':
-                profile = self.get_beb_profile(tabata_integration_dimension)
+                profile = self.get_beb_profile(tabata_integration_dimension, executor)
             elif profile_name == 'nrl':
-                profile = self.get_nrl_profile(tabata_integration_dimension)
+                profile = self.get_nrl_profile(tabata_integration_dimension, executor)
             elif profile_name == 'tabata':
-                profile = self.get_tabata_profile(tabata_integration_dimension)
+                profile = self.get_tabata_profile(tabata_integration_dimension, executor)
             else:
                 raise (ValueError('Invalid profile: ' + profile_name))
             self.export_profile(profile_name, tabata_integration_dimension, profile)
-        rate = self.resolve_log_spline(profile, temperatures) * densities / self.speed
-        return numpy.exp(scipy.integrate.cumulative_trapezoid(rate, radial_coordinates, initial=0))
+        return profile
+
+    def get_attenuation(self, radial_coordinates, temperatures, densities, profile_name,
+                        tabata_integration_dimension=-1, executor=None):
+        profile = self.get_profile(profile_name, tabata_integration_dimension, executor)
+        return self.get_attenuation_from_profile(profile, radial_coordinates, temperatures, densities)
+
+    def iterate_attenuation(self, radial_coordinates, time_slices, profile_name, tabata_integration_dimension=-1,
+                            chunk_size=64):
+        profile = self.get_profile(profile_name, tabata_integration_dimension)
+        chunk = []
+        for time_slice in time_slices:
+            chunk.append(time_slice)
+            if len(chunk) == chunk_size:
+                yield from self.get_chunk_attenuation(profile, radial_coordinates, chunk)
+                chunk = []
+        if chunk:
+            yield from self.get_chunk_attenuation(profile, radial_coordinates, chunk)
+
+    def get_chunk_attenuation(self, profile, radial_coordinates, chunk):
+        temperatures, densities = zip(*chunk)
+        return self.get_attenuation_from_profile(profile, radial_coordinates, numpy.array(temperatures),
+                                                 numpy.array(densities))
+
+    def get_attenuation_from_profile(self, profile, radial_coordinates, temperatures, densities):
+        return self.get_attenuation_from_rates(self.resolve_log_spline(profile, temperatures), radial_coordinates,
+                                               densities)
+
+    def get_nrl_attenuation(self, radial_coordinates, temperatures, densities):
+        from nrl.rate import get_nrl_rates
+        temperatures = numpy.asarray(temperatures, dtype=float)
+        is_resolved = temperatures > 0
+        rates = numpy.zeros_like(temperatures)
+        rates[is_resolved] = get_nrl_rates(self.species, temperatures[is_resolved], self.ionisation_level)
+        return self.get_attenuation_from_rates(rates, radial_coordinates, densities)
+
+    def get_attenuation_with_jacobians(self, radial_coordinates, temperatures, densities, profile_name,
+                                       tabata_integration_dimension=-1, executor=None):
+        profile = self.get_profile(profile_name, tabata_integration_dimension, executor)
+        return self.get_attenuation_with_jacobians_from_profile(profile, radial_coordinates, temperatures, densities)
+
+    def get_attenuation_with_jacobians_from_profile(self, profile, radial_coordinates, temperatures, densities):
+        densities = numpy.asarray(densities, dtype=float)
+        rates, rate_derivatives = self.resolve_log_spline_with_derivative(profile, temperatures)
+        attenuation = self.get_attenuation_from_rates(rates, radial_coordinates, densities)
+        rate_jacobian = attenuation[..., :, numpy.newaxis] / self.speed * \
+            get_cumulative_trapezoid_jacobian(numpy.asarray(radial_coordinates, dtype=float))
+        return attenuation, rate_jacobian * rates[..., numpy.newaxis, :], \
+            rate_jacobian * (densities * rate_derivatives)[..., numpy.newaxis, :]
+
+    def get_attenuation_vjp(self, radial_coordinates, temperatures, densities, cotangent, profile_name,
+                            tabata_integration_dimension=-1, executor=None):
+        profile = self.get_profile(profile_name, tabata_integration_dimension, executor)
+        return self.get_attenuation_vjp_from_profile(profile, radial_coordinates, temperatures, densities, cotangent)
+
+    def get_attenuation_vjp_from_profile(self, profile, radial_coordinates, temperatures, densities, cotangent):
+        densities = numpy.asarray(densities, dtype=float)
+        rates, rate_derivatives = self.resolve_log_spline_with_derivative(profile, temperatures)
+        attenuation = self.get_attenuation_from_rates(rates, radial_coordinates, densities)
+        rate_vjp = get_cumulative_trapezoid_vjp(cotangent * attenuation,
+                                                numpy.asarray(radial_coordinates, dtype=float)) / self.speed
+        return attenuation, rate_vjp * rates, rate_vjp * densities * rate_derivatives
+
+    def get_density(self, radial_coordinates, temperatures, attenuation, profile_name, tabata_integration_dimension=-1,
+                    edge_density=None, regularisation=None, executor=None):
+        profile = self.get_profile(profile_name, tabata_integration_dimension, executor)
+        return self.get_density_from_profile(profile, radial_coordinates, temperatures, attenuation, edge_density,
+                                             regularisation)
+
+    def iterate_density(self, radial_coordinates, time_slices, profile_name, tabata_integration_dimension=-1,
+                        edge_density=None, regularisation=None, chunk_size=64):
+        profile = self.get_profile(profile_name, tabata_integration_dimension)
+        chunk = []
+        for time_slice in time_slices:
+            chunk.append(time_slice)
+            if len(chunk) == chunk_size:
+                yield from self.get_chunk_density(profile, radial_coordinates, chunk, edge_density, regularisation)
+                chunk = []
+        if chunk:
+            yield from self.get_chunk_density(profile, radial_coordinates, chunk, edge_density, regularisation)
+
+    def get_chunk_density(self, profile, radial_coordinates, chunk, edge_density=None, regularisation=None):
+        temperatures, attenuation = zip(*chunk)
+        return self.get_density_from_profile(profile, radial_coordinates, numpy.array(temperatures),
+                                             numpy.array(attenuation), edge_density, regularisation)
+
+    def get_density_from_profile(self, profile, radial_coordinates, temperatures, attenuation, edge_density=None,
+                                 regularisation=None):
+        radial_coordinates = numpy.asarray(radial_coordinates, dtype=float)
+        log_attenuation = numpy.log(numpy.asarray(attenuation, dtype=float))
+        density_to_rate = self.resolve_log_spline(profile, numpy.asarray(temperatures, dtype=float)) / self.speed
+        if regularisation is not None:
+            return self.get_regularised_density(radial_coordinates, density_to_rate, log_attenuation, regularisation,
+                                                edge_density)
+        steps = numpy.diff(radial_coordinates)
+        rates = numpy.zeros_like(log_attenuation)
+        if edge_density is not None:
+            rates[..., 0] = edge_density * density_to_rate[..., 0]
+        # the trapezoid rule marched outward: log A_i - log A_i-1 = (r_i-1 + r_i) dx / 2
+        for i in range(1, radial_coordinates.size):
+            rates[..., i] = 2.0 * (log_attenuation[..., i] - log_attenuation[..., i - 1]) / steps[i - 1] - \
+                rates[..., i - 1]
+        if edge_density is None:
+            # an unknown edge rate adds a sawtooth (-1)^i to every rate, the smoothest one is kept
+            sawtooth = (-1.0) ** numpy.arange(radial_coordinates.size)
+            rates = rates - numpy.sum(numpy.diff(rates) * numpy.diff(sawtooth), axis=-1, keepdims=True) / \
+                numpy.sum(numpy.diff(sawtooth) ** 2) * sawtooth
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return rates / density_to_rate
+
+    @staticmethod
+    def get_regularised_density(radial_coordinates, density_to_rate, log_attenuation, regularisation,
+                                edge_density=None):
+        size = radial_coordinates.size
+        operator = get_cumulative_trapezoid_jacobian(radial_coordinates) * density_to_rate[..., numpy.newaxis, :]
+        smoothing = numpy.broadcast_to(numpy.diff(numpy.eye(size), 2, axis=0), operator.shape[:-2] + (size - 2, size))
+        smoothing_target = numpy.zeros(operator.shape[:-2] + (size - 2,))
+        if edge_density is not None:
+            # a known edge density is a hard constraint, its terms move to the right hand side
+            edge_density = numpy.asarray(edge_density, dtype=float)[..., numpy.newaxis]
+            log_attenuation = log_attenuation - operator[..., 0] * edge_density
+            smoothing_target = smoothing_target - smoothing[..., 0] * edge_density
+            operator = operator[..., 1:]
+            smoothing = smoothing[..., 1:]
+        normal_operator = numpy.einsum('...ji,...jk->...ik', operator, operator)
+        normal_smoothing = numpy.einsum('...ji,...jk->...ik', smoothing, smoothing)
+        # the regularisation is relative to the data term, so it is free of the density and rate units
+        scale = regularisation * numpy.trace(normal_operator, axis1=-2, axis2=-1) / \
+            numpy.trace(normal_smoothing, axis1=-2, axis2=-1)
+        normal_operator = normal_operator + scale[..., numpy.newaxis, numpy.newaxis] * normal_smoothing
+        right_hand_side = numpy.einsum('...ji,...j->...i', operator, log_attenuation) + \
+            scale[..., numpy.newaxis] * numpy.einsum('...ji,...j->...i', smoothing, smoothing_target)
+        densities = numpy.linalg.solve(normal_operator, right_hand_side[..., numpy.newaxis])[..., 0]
+        if edge_density is not None:
+            densities = numpy.concatenate([numpy.broadcast_to(edge_density, densities.shape[:-1] + (1,)),
+                                           densities], axis=-1)
+        return densities
+
+    def get_density_from_light(self, radial_coordinates, temperatures, light, edge_density, profile_name,
+                               tabata_integration_dimension=-1, emission=1.0, executor=None):
+        profile = self.get_profile(profile_name, tabata_integration_dimension, executor)
+        return self.get_density_from_light_and_profile(profile, radial_coordinates, temperatures, light, edge_density,
+                                                       emission)
+
+    def get_density_from_light_and_profile(self, profile, radial_coordinates, temperatures, light, edge_density,
+                                           emission=1.0):
+        import scipy.special
+        if numpy.any(numpy.asarray(edge_density) <= 0.0):
+            raise ValueError('The light calibration needs a positive edge density: ' + str(edge_density))
+        radial_coordinates = numpy.asarray(radial_coordinates, dtype=float)
+        density_to_rate = self.resolve_log_spline(profile, numpy.asarray(temperatures, dtype=float)) / self.speed
+        # the light is calibration * emission * density * attenuation, with no attenuation at the edge
+        light = numpy.asarray(light, dtype=float) / numpy.broadcast_to(emission, density_to_rate.shape)
+        if not numpy.all(light > 0.0) or not numpy.all(numpy.isfinite(light)):
+            raise ValueError('The light calibration needs a positive and finite light profile: ' + str(light))
+        densities = numpy.zeros_like(light)
+        densities[..., 0] = edge_density
+        light = light / (light[..., :1] / densities[..., :1])
+        rates = densities[..., 0] * density_to_rate[..., 0]
+        log_attenuation = numpy.zeros_like(light[..., 0])
+        steps = numpy.diff(radial_coordinates)
+        for i in range(1, radial_coordinates.size):
+            # n exp(a n) = b, solved by the principal branch of the Lambert W function
+            a = 0.5 * steps[i - 1] * density_to_rate[..., i]
+            b = light[..., i] * numpy.exp(-log_attenuation - 0.5 * steps[i - 1] * rates)
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                densities[..., i] = numpy.where(a == 0.0, b, scipy.special.lambertw(a * b).real / a)
+            # with decreasing radial coordinates a is negative, and a light too bright for the rates has no solution
+            densities[..., i] = numpy.where(a * b < -numpy.exp(-1.0), numpy.nan, densities[..., i])
+            next_rates = densities[..., i] * density_to_rate[..., i]
+            log_attenuation = log_attenuation + 0.5 * steps[i - 1] * (rates + next_rates)
+            rates = next_rates
+        return densities
+
+    def get_attenuation_from_rates(self, rates, radial_coordinates, densities):
+        rate = rates * densities / self.speed
+        return numpy.exp(get_cumulative_trapezoid(rate, numpy.asarray(radial_coordinates, dtype=float)))
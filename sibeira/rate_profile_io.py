@@ -1,18 +1,113 @@
+import contextlib
 import os
+import tempfile
+import threading
 import numpy
 
+from sibeira import instrumentation
 from sibeira.rate import Rate
+from sibeira.rate_profile_store import ColumnarProfileStore
+
+
+def get_file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ProfileDatabaseCache:
+    def __init__(self):
+        self.databases = {}
+        self.pending_databases = {}
+        self.batch_depth = 0
+        self.lock = threading.RLock()
+
+    def load(self, path):
+        with self.lock:
+            if path in self.pending_databases:
+                instrumentation.count('profile_database_cache/pending_hit')
+                return self.pending_databases[path]
+            signature = get_file_signature(path)
+            if path not in self.databases or self.databases[path][0] != signature:
+                instrumentation.count('profile_database_cache/miss')
+                with instrumentation.time_stage('database/load'):
+                    self.databases[path] = (signature, numpy.load(path, allow_pickle=True).item())
+            else:
+                instrumentation.count('profile_database_cache/hit')
+            return self.databases[path][1]
+
+    def stage(self, path, profile_database):
+        with self.lock:
+            self.pending_databases[path] = profile_database
+            if self.batch_depth == 0:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            for path, profile_database in self.pending_databases.items():
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # an interrupted save must not truncate the database, which checkpoints the precompute CLI
+                handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+                with instrumentation.time_stage('database/save'):
+                    with os.fdopen(handle, 'wb') as f:
+                        numpy.save(f, profile_database)
+                os.replace(temporary_path, path)
+                self.databases[path] = (get_file_signature(path), profile_database)
+            self.pending_databases.clear()
+
+    @contextlib.contextmanager
+    def batch(self):
+        with self.lock:
+            self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.batch_depth -= 1
+                if self.batch_depth == 0:
+                    self.flush()
+
+    def clear(self):
+        with self.lock:
+            self.databases.clear()
+
+
+profile_database_cache = ProfileDatabaseCache()
 
 
 class RateProfileIO(Rate):
     default_destination_directory = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data')
+    destination_directory = default_destination_directory
+    profile_storage = 'pickle'
+
+    @staticmethod
+    def get_spline(energy, cross_section):
+        import scipy.interpolate
+        with instrumentation.time_stage('profile/spline'):
+            return scipy.interpolate.interp1d(numpy.log(energy), numpy.log(cross_section),
+                                              kind='cubic', fill_value='extrapolate')
+
+    def set_profile_storage(self, profile_storage):
+        if profile_storage not in ['pickle', 'columnar']:
+            raise ValueError('Invalid profile storage: ' + str(profile_storage))
+        self.profile_storage = profile_storage
 
-    def import_profile(self, profile_name, tabata_integration_dimension, destination_directory='data'):
+    def set_destination_directory(self, destination_directory):
+        self.destination_directory = destination_directory
+
+    def import_profile(self, profile_name, tabata_integration_dimension, destination_directory=None):
+        if destination_directory is None:
+            destination_directory = self.destination_directory
         try:
-            path = self.get_file_name(destination_directory)
             beam_energy_as_string = self.get_beam_energy_as_string()
-            dimension_as_string = str(tabata_integration_dimension)
-            profile_database = numpy.load(path, allow_pickle=True).item()
+            dimension_as_string = self.get_dimension_as_string(tabata_integration_dimension)
+            if self.profile_storage == 'columnar':
+                store = ColumnarProfileStore(destination_directory, self.species)
+                key = store.get_key(beam_energy_as_string, profile_name, dimension_as_string)
+                profile = self.get_spline(*store.read(key))
+                if store.read_error(key) is not None:
+                    profile.error = store.read_error(key)
+                return profile
+            profile_database = profile_database_cache.load(self.get_file_name(destination_directory))
             return profile_database[beam_energy_as_string][profile_name][dimension_as_string]
         except FileNotFoundError:
             raise (FileNotFoundError('There is no profile for ' + self.species))
@@ -33,19 +128,30 @@ class RateProfileIO(Rate):
             profile_database[beam_energy_as_string][profile_name] = {}
         profile_database[beam_energy_as_string][profile_name][dimension_as_string] = profile
 
-    def export_profile(self, profile_name, tabata_integration_dimension, profile,
-                       destination_directory=default_destination_directory):
-        path = self.get_file_name(destination_directory)
-        try:
-            profile_database = numpy.load(path, allow_pickle=True).item()
-        except (FileNotFoundError, EOFError):
-            profile_database = {}
+    def export_profile(self, profile_name, tabata_integration_dimension, profile, destination_directory=None):
+        if destination_directory is None:
+            destination_directory = self.destination_directory
         beam_energy_as_string = self.get_beam_energy_as_string()
-        dimension_as_string = str(tabata_integration_dimension)
-        self.add_to_database(profile_database, profile, beam_energy_as_string, dimension_as_string, profile_name)
-        if not (os.path.exists(destination_directory)):
-            os.mkdir(destination_directory)
-        numpy.save(path, profile_database)
+        dimension_as_string = self.get_dimension_as_string(tabata_integration_dimension)
+        if self.profile_storage == 'columnar':
+            store = ColumnarProfileStore(destination_directory, self.species)
+            store.write(store.get_key(beam_energy_as_string, profile_name, dimension_as_string),
+                        numpy.exp(profile.x), numpy.exp(profile.y), getattr(profile, 'error', None))
+            return
+        path = self.get_file_name(destination_directory)
+        with profile_database_cache.lock:
+            try:
+                profile_database = profile_database_cache.load(path)
+            except (FileNotFoundError, EOFError):
+                profile_database = {}
+            self.add_to_database(profile_database, profile, beam_energy_as_string, dimension_as_string,
+                                 profile_name)
+            profile_database_cache.stage(path, profile_database)
+
+    def get_dimension_as_string(self, tabata_integration_dimension):
+        if self.double_charge_exchange and tabata_integration_dimension >= 0:
+            return str(tabata_integration_dimension) + '+double'
+        return str(tabata_integration_dimension)
 
     def get_beam_energy_as_string(self):
         return str(self.beam_energy / 1000.)
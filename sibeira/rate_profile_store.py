@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import threading
+import numpy
+
+from sibeira import instrumentation
+
+indices = {}
+lock = threading.Lock()
+
+
+class ColumnarProfileStore:
+    def __init__(self, directory, species):
+        self.directory = directory
+        self.index_path = os.path.join(directory, species + '.profiles.json')
+        self.data_path = os.path.join(directory, species + '.profiles.bin')
+
+    @staticmethod
+    def get_key(beam_energy_as_string, profile_name, dimension_as_string):
+        return beam_energy_as_string + '/' + profile_name + '/' + dimension_as_string
+
+    def read_index(self):
+        stat = os.stat(self.index_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self.index_path not in indices or indices[self.index_path][0] != signature:
+            instrumentation.count('columnar_index/miss')
+            with open(self.index_path) as f:
+                indices[self.index_path] = (signature, json.load(f))
+        else:
+            instrumentation.count('columnar_index/hit')
+        return indices[self.index_path][1]
+
+    def read(self, key):
+        record = self.read_index()[key]
+        data = numpy.memmap(self.data_path, dtype='<f8', mode='r')
+        start = record['offset']
+        size = record['size']
+        return numpy.array(data[start:start + size]), numpy.array(data[start + size:start + 2 * size])
+
+    def read_error(self, key):
+        return self.read_index()[key].get('error')
+
+    def write(self, key, temperatures, rates, error=None):
+        os.makedirs(self.directory, exist_ok=True)
+        record = numpy.concatenate([temperatures, rates]).astype('<f8')
+        with lock:
+            try:
+                index = dict(self.read_index())
+            except FileNotFoundError:
+                index = {}
+            with open(self.data_path, 'ab') as f:
+                f.seek(0, os.SEEK_END)
+                offset = f.tell() // record.itemsize
+                f.write(record.tobytes())
+            index[key] = dict(offset=offset, size=len(temperatures))
+            if error is not None:
+                index[key]['error'] = error
+            self.write_index(index)
+
+    def write_index(self, index):
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f:
+            json.dump(index, f)
+        os.replace(temporary_path, self.index_path)
+
+
+def convert_pickle_database(path, destination_directory, species):
+    store = ColumnarProfileStore(destination_directory, species)
+    profile_database = numpy.load(path, allow_pickle=True).item()
+    for beam_energy_as_string, profiles in profile_database.items():
+        for profile_name, dimensions in profiles.items():
+            for dimension_as_string, profile in dimensions.items():
+                store.write(store.get_key(beam_energy_as_string, profile_name, dimension_as_string),
+                            numpy.exp(profile.x), numpy.exp(profile.y), getattr(profile, 'error', None))
+    return store
@@ -0,0 +1,95 @@
+import functools
+import numpy
+import scipy.interpolate
+
+from sibeira.rate import Rate
+
+
+def load_rate_table(path):
+    with numpy.load(path) as data:
+        rate_table = RateTable(str(data['species']), str(data['profile_name']),
+                               int(data['tabata_integration_dimension']), data['beam_energies'],
+                               data['temperatures'], int(data['ionisation_level']))
+        rate_table.set_rates(data['rates'], float(data['error']))
+    return rate_table
+
+
+class RateTable:
+    def __init__(self, species, profile_name, tabata_integration_dimension=-1, beam_energies=None,
+                 temperatures=None, ionisation_level=0):
+        if profile_name not in ['nrl', 'beb', 'tabata']:
+            raise ValueError('Invalid profile: ' + str(profile_name))
+        self.species = species
+        self.profile_name = profile_name
+        self.tabata_integration_dimension = tabata_integration_dimension
+        self.ionisation_level = ionisation_level
+        self.beam_energies = numpy.geomspace(5000., 100000., 25) if beam_energies is None \
+            else numpy.asarray(beam_energies, dtype=float)
+        self.temperatures = numpy.geomspace(10., 10000., 31) if temperatures is None \
+            else numpy.asarray(temperatures, dtype=float)
+        self.rates = None
+        self.spline = None
+        self.error = numpy.nan
+
+    def compute(self):
+        self.set_rates(self.get_rates(self.temperatures, self.beam_energies))
+        self.error = self.get_error_bound()
+        return self
+
+    def get_rates(self, temperatures, beam_energies):
+        r = Rate(self.species, beam_energies[0], self.ionisation_level)
+        # the whole grid is integrated in one vectorised pass
+        r.set_integration_method('gauss')
+        return getattr(r, 'get_full_rate_grid_with_' + self.profile_name)(temperatures, beam_energies,
+                                                                         self.tabata_integration_dimension)
+
+    def set_rates(self, rates, error=numpy.nan):
+        self.rates = numpy.asarray(rates, dtype=float)
+        if self.rates.shape != (self.temperatures.size, self.beam_energies.size):
+            raise ValueError('Rate table shape does not match its axes: ' + str(self.rates.shape))
+        self.spline = scipy.interpolate.RectBivariateSpline(numpy.log(self.temperatures),
+                                                            numpy.log(self.beam_energies),
+                                                            numpy.log(self.rates), kx=3, ky=3)
+        self.error = error
+
+    def get_error_bound(self):
+        temperatures = numpy.sqrt(self.temperatures[1:] * self.temperatures[:-1])
+        beam_energies = numpy.sqrt(self.beam_energies[1:] * self.beam_energies[:-1])
+        rates = self.get_rates(temperatures, beam_energies)
+        interpolated_rates = numpy.exp(self.spline(numpy.log(temperatures), numpy.log(beam_energies)))
+        return float(numpy.max(numpy.abs(interpolated_rates / rates - 1.0)))
+
+    def check_beam_energy(self, beam_energy):
+        if not self.beam_energies[0] <= beam_energy <= self.beam_energies[-1]:
+            raise ValueError('Beam energy is out of the rate table range: ' + str(beam_energy))
+
+    def get_log_rate(self, log_beam_energy, log_temperatures):
+        # ev would clamp to the edge of the temperature axis, so the log-log rate is continued linearly instead
+        log_temperatures = numpy.asarray(log_temperatures, dtype=float)
+        edge = numpy.clip(log_temperatures, numpy.log(self.temperatures[0]), numpy.log(self.temperatures[-1]))
+        log_beam_energies = numpy.full_like(edge, log_beam_energy)
+        return self.spline.ev(edge, log_beam_energies) + \
+            (log_temperatures - edge) * self.spline.ev(edge, log_beam_energies, dx=1)
+
+    def get_rate(self, temperatures, beam_energy):
+        self.check_beam_energy(beam_energy)
+        temperatures = numpy.asarray(temperatures, dtype=float)
+        rates = numpy.zeros_like(temperatures)
+        is_resolved = ~(temperatures <= 0)
+        rates[is_resolved] = numpy.exp(self.get_log_rate(numpy.log(beam_energy),
+                                                         numpy.log(temperatures[is_resolved])))
+        return rates
+
+    def get_profile(self, beam_energy):
+        self.check_beam_energy(beam_energy)
+        return functools.partial(self.get_log_rate, numpy.log(beam_energy))
+
+    def is_matching(self, species, ionisation_level, profile_name, tabata_integration_dimension):
+        return self.species == species and self.ionisation_level == ionisation_level and \
+            self.profile_name == profile_name and self.tabata_integration_dimension == tabata_integration_dimension
+
+    def save(self, path):
+        numpy.savez(path, species=self.species, profile_name=self.profile_name,
+                    tabata_integration_dimension=self.tabata_integration_dimension,
+                    ionisation_level=self.ionisation_level, beam_energies=self.beam_energies,
+                    temperatures=self.temperatures, rates=self.rates, error=self.error)
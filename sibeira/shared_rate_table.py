@@ -0,0 +1,144 @@
+import os
+import tempfile
+import numpy
+
+from sibeira.quadrature import read_only
+from sibeira.rate_profile_io import RateProfileIO, profile_database_cache
+from sibeira.rate_profile_store import ColumnarProfileStore
+
+
+def get_key(species, beam_energy_as_string, profile_name, dimension_as_string):
+    return species + '/' + ColumnarProfileStore.get_key(beam_energy_as_string, profile_name, dimension_as_string)
+
+
+def collect_profiles(species, destination_directory=RateProfileIO.default_destination_directory,
+                     profile_storage='pickle'):
+    profiles = {}
+    if profile_storage == 'columnar':
+        store = ColumnarProfileStore(destination_directory, species)
+        for store_key in store.read_index():
+            profiles[species + '/' + store_key] = store.read(store_key) + (store.read_error(store_key),)
+        return profiles
+    profile_database = profile_database_cache.load(RateProfileIO(species, 0).get_file_name(destination_directory))
+    for beam_energy_as_string, models in profile_database.items():
+        for profile_name, dimensions in models.items():
+            for dimension_as_string, profile in dimensions.items():
+                profiles[get_key(species, beam_energy_as_string, profile_name, dimension_as_string)] = \
+                    (numpy.exp(profile.x), numpy.exp(profile.y), getattr(profile, 'error', None))
+    return profiles
+
+
+def publish_profiles(species, backend='shared_memory', path=None,
+                     destination_directory=RateProfileIO.default_destination_directory, profile_storage='pickle'):
+    profiles = {}
+    for s in species:
+        profiles.update(collect_profiles(s, destination_directory, profile_storage))
+    return SharedRateTables(profiles, backend, path)
+
+
+class SharedRateTables:
+    def __init__(self, profiles, backend='shared_memory', path=None):
+        index = {}
+        records = []
+        offset = 0
+        for key in sorted(profiles):
+            temperatures, rates, error = profiles[key]
+            records.append(numpy.concatenate([temperatures, rates]).astype('<f8'))
+            index[key] = dict(offset=offset, size=len(temperatures), error=error)
+            offset += 2 * len(temperatures)
+        data = numpy.concatenate(records) if records else numpy.zeros(0, dtype='<f8')
+        self.shared_memory = None
+        if backend == 'shared_memory':
+            try:
+                from multiprocessing import shared_memory
+            except ImportError:
+                raise ValueError('Shared memory rate tables need Python 3.8 or newer')
+            self.shared_memory = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+            numpy.ndarray(data.shape, dtype='<f8', buffer=self.shared_memory.buf)[:] = data
+            name = self.shared_memory.name
+        elif backend == 'memmap':
+            if path is None:
+                raise ValueError('The memmap backend needs a path')
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            handle, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as f:
+                f.write(data.tobytes())
+            os.replace(temporary_path, path)
+            name = path
+        else:
+            raise ValueError('Invalid shared rate table backend: ' + str(backend))
+        self.handle = SharedRateTableHandle(backend, name, data.size, index)
+
+    def close(self):
+        self.handle.detach()
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+            self.shared_memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+class SharedRateTableHandle:
+    def __init__(self, backend, name, size, index):
+        self.backend = backend
+        self.name = name
+        self.size = size
+        self.index = index
+        self.shared_memory = None
+        self.data = None
+        self.profiles = {}
+
+    def __getstate__(self):
+        # only the name and the index travel to the workers, the data is attached there
+        return dict(backend=self.backend, name=self.name, size=self.size, index=self.index)
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def attach(self):
+        if self.data is not None:
+            return self.data
+        if self.size == 0:
+            self.data = read_only(numpy.zeros(0, dtype='<f8'))
+        elif self.backend == 'shared_memory':
+            from multiprocessing import shared_memory
+            self.shared_memory = shared_memory.SharedMemory(name=self.name)
+            self.data = read_only(numpy.ndarray(self.size, dtype='<f8', buffer=self.shared_memory.buf))
+        else:
+            self.data = numpy.memmap(self.name, dtype='<f8', mode='r', shape=(self.size,))
+        return self.data
+
+    def detach(self):
+        self.profiles.clear()
+        self.data = None
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory = None
+
+    def has_profile(self, key):
+        return key in self.index
+
+    def get_arrays(self, key):
+        record = self.index[key]
+        data = self.attach()
+        start = record['offset']
+        size = record['size']
+        return data[start:start + size], data[start + size:start + 2 * size]
+
+    def find_profile(self, species, beam_energy_as_string, profile_name, dimension_as_string):
+        key = get_key(species, beam_energy_as_string, profile_name, dimension_as_string)
+        return self.get_profile(key) if self.has_profile(key) else None
+
+    def get_profile(self, key):
+        if key not in self.profiles:
+            profile = RateProfileIO.get_spline(*self.get_arrays(key))
+            if self.index[key]['error'] is not None:
+                profile.error = self.index[key]['error']
+            self.profiles[key] = profile
+        return self.profiles[key]
@@ -1,3 +1,4 @@
+import numpy
 import scipy.constants
 
 RYDBERG = scipy.constants.Rydberg * scipy.constants.Planck * scipy.constants.c / scipy.constants.elementary_charge
@@ -31,7 +32,7 @@ class OrbitalConstants:
 
     @staticmethod
     def __get_orbital_constants(species):
-        return orbital_constants[species]
+        return dict(orbital_constants[species])
 
     def get(self, field):
         return self.orbital_constants[field]
@@ -56,7 +57,7 @@ class IonOrbitalConstants(OrbitalConstants):
 
     @staticmethod
     def __get_orbital_constants(species):
-        return ion_orbital_constants[species]
+        return dict(ion_orbital_constants[species])
 
     def fill_U(self):
         self.orbital_constants['U'] = (self.orbital_constants['Z']-5.0/16.0)**2 * 2.0 * RYDBERG
@@ -70,3 +71,30 @@ ion_orbital_constants = {
     'Rb': dict(pqn=5, Z=37, B=27.28954, N=6),
     'Cs': dict(pqn=6, Z=55, B=23.15745, N=6)
 }
+
+
+orbital_constant_fields = ['B', 'U', 'N', 'n', 'Q']
+
+
+def get_orbital_constant_table():
+    table = {}
+    for ionisation_level, constants_class, constants in [(0, OrbitalConstants, orbital_constants),
+                                                         (1, IonOrbitalConstants, ion_orbital_constants)]:
+        for species in constants:
+            o = constants_class(species)
+            table[(species, ionisation_level)] = [float(o.get(field)) for field in orbital_constant_fields]
+    return table
+
+
+orbital_constant_table = get_orbital_constant_table()
+
+
+def get_orbital_constant_arrays(species, ionisation_level=0):
+    species, ionisation_level = numpy.broadcast_arrays(numpy.asarray(species, dtype=object),
+                                                       numpy.asarray(ionisation_level))
+    try:
+        rows = [orbital_constant_table[(s, int(level))] for s, level in zip(species.ravel(), ionisation_level.ravel())]
+    except KeyError as error:
+        raise ValueError('The orbital constants are unknown: ' + str(error.args[0]))
+    rows = numpy.array(rows, dtype=float).reshape(species.shape + (len(orbital_constant_fields),))
+    return {field: rows[..., i] for i, field in enumerate(orbital_constant_fields)}
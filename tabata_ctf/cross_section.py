@@ -1,7 +1,39 @@
 import os
 import numpy
 import scipy.interpolate
-import pandas
+
+from sibeira.log_table import LogTable
+
+tabata_tables = {}
+
+
+def get_tabata_path(degree, extension='.dat'):
+    return os.path.dirname(__file__) + '/' + degree + extension
+
+
+def get_tabata_table(degree):
+    if degree not in tabata_tables:
+        tabata_tables[degree] = load_tabata_table(degree)
+    return tabata_tables[degree]
+
+
+def load_tabata_table(degree):
+    path = get_tabata_path(degree)
+    compiled_path = get_tabata_path(degree, '.npy')
+    if os.path.exists(compiled_path) and os.path.getmtime(compiled_path) >= os.path.getmtime(path):
+        table = numpy.load(compiled_path)
+    else:
+        table = read_tabata_table(path)
+    table.flags.writeable = False
+    return table
+
+
+def read_tabata_table(path):
+    return numpy.genfromtxt(path, delimiter='\t', names=True, dtype=None, encoding='utf-8')
+
+
+def compile_tabata_table(degree):
+    numpy.save(get_tabata_path(degree, '.npy'), read_tabata_table(get_tabata_path(degree)))
 
 
 # T Tabata et al., Nucl. Inst. Meth. Phys. Res. B, 31 (3), 1988
@@ -12,26 +44,25 @@ class CrossSection:
         self.tabata_data = self.get_tabata_data()
 
     def get_tabata_data(self):
-        tabata_dataframe = pandas.read_csv(os.path.dirname(__file__) + '/' + self.degree + '.dat', sep='\t')
-        tabata_dataframe.replace('Infinity', numpy.inf, inplace=True)
-        tabata_data = tabata_dataframe[tabata_dataframe['target'] == self.species]
-        if tabata_data.empty:
+        tabata_table = get_tabata_table(self.degree)
+        tabata_rows = tabata_table[tabata_table['target'] == self.species]
+        if tabata_rows.size == 0:
             raise ValueError('Invalid species for Tabata database: ' + self.species)
-        return tabata_data
+        return {name: float(tabata_rows[0][name]) for name in tabata_table.dtype.names if name != 'target'}
 
     def get_f(self, E1):
         ER = 25.00
-        if self.tabata_data['a3'].to_numpy() == numpy.inf:
-            return self.tabata_data['a1'].to_numpy() * (E1 / ER) ** self.tabata_data['a2'].to_numpy() / \
+        if self.tabata_data['a3'] == numpy.inf:
+            return self.tabata_data['a1'] * (E1 / ER) ** self.tabata_data['a2'] / \
                    (1.0 +
-                    (E1 / self.tabata_data['a5'].to_numpy()) **
-                    (self.tabata_data['a2'].to_numpy() + self.tabata_data['a6'].to_numpy()))
-        return self.tabata_data['a1'].to_numpy() * (E1 / ER) ** self.tabata_data['a2'].to_numpy() / \
+                    (E1 / self.tabata_data['a5']) **
+                    (self.tabata_data['a2'] + self.tabata_data['a6']))
+        return self.tabata_data['a1'] * (E1 / ER) ** self.tabata_data['a2'] / \
                (1.0 +
-                (E1 / self.tabata_data['a3'].to_numpy()) **
-                (self.tabata_data['a2'].to_numpy() + self.tabata_data['a4'].to_numpy()) +
-                (E1 / self.tabata_data['a5'].to_numpy()) **
-                (self.tabata_data['a2'].to_numpy() + self.tabata_data['a6'].to_numpy()))
+                (E1 / self.tabata_data['a3']) **
+                (self.tabata_data['a2'] + self.tabata_data['a4']) +
+                (E1 / self.tabata_data['a5']) **
+                (self.tabata_data['a2'] + self.tabata_data['a6']))
 
     @staticmethod
     def replace_nan_to_zero(a):
@@ -41,13 +72,13 @@ class CrossSection:
 
     def calculate(self, energy):
         try:
-            E1 = energy / 1000.0 - self.tabata_data['Et'].to_numpy()
+            E1 = numpy.asarray(energy, dtype=float) / 1000.0 - self.tabata_data['Et']
             sigma0 = 1e-20
             cross_section = sigma0 * (self.get_f(E1) +
-                                      self.tabata_data['a7'].to_numpy() *
-                                      self.get_f(E1 / self.tabata_data['a8'].to_numpy()))
+                                      self.tabata_data['a7'] *
+                                      self.get_f(E1 / self.tabata_data['a8']))
 
-            return self.replace_nan_to_zero(cross_section)
+            return self.replace_nan_to_zero(numpy.asarray(cross_section))
         except KeyError:
             raise KeyError('Broken database, missing argument')
 
@@ -55,3 +86,15 @@ class CrossSection:
         energy = numpy.logspace(0.75, 5, 50)
         cross_section = self.calculate(energy)
         return scipy.interpolate.interp1d(energy, cross_section, fill_value='extrapolate')
+
+    def get_parameters(self):
+        return dict(degree=self.degree, **self.tabata_data)
+
+    def get_threshold(self):
+        return max(1000.0 * self.tabata_data['Et'], 0.0)
+
+    def get_function(self):
+        return lambda energy: self.calculate(numpy.maximum(energy, self.get_threshold()))
+
+    def get_table(self, maximum=1e7, size=4096):
+        return LogTable(self.get_function(), max(self.get_threshold(), 1.0), maximum, size)
@@ -0,0 +1,30 @@
+import contextlib
+import io
+import unittest
+
+from benchmark.run import compare, format_time, get_failed_accuracy, load_references, measure, run_accuracy
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_format_time(self):
+        self.assertEqual('1.5 s', format_time(1.5))
+        self.assertEqual('250 ms', format_time(0.25))
+        self.assertEqual('3 us', format_time(3e-6))
+        self.assertEqual('20 ns', format_time(2e-8))
+
+    def test_measure(self):
+        self.assertGreater(measure(lambda: sum(range(100)), repeat=2, minimum_time=0.01), 0)
+
+    def test_compare(self):
+        baseline = dict(timings={'a': 1.0, 'b': 1.0, 'c': 1.0})
+        results = dict(timings={'a': 1.1, 'b': 2.0, 'd': 5.0})
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(['b'], compare(results, baseline, threshold=1.2))
+
+    def test_failed_accuracy(self):
+        self.assertEqual(['x/gauss'], get_failed_accuracy({'x/gauss': 1e-2, 'x/quad': 1e-4}))
+
+    def test_accuracy(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            deviations = run_accuracy(load_references())
+        self.assertEqual([], get_failed_accuracy(deviations))
@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+
+from sibeira.coefficient_cache import CoefficientCache, get_key
+from sibeira.integrator import RateIntegrator
+
+
+class TestCoefficientCache(unittest.TestCase):
+    def test_key(self):
+        self.assertEqual(get_key(dict(a=1, b=2)), get_key(dict(b=2, a=1)))
+        self.assertNotEqual(get_key(dict(a=1, b=2)), get_key(dict(a=1, b=3)))
+
+    def test_memory(self):
+        cache = CoefficientCache()
+        cache.set(dict(a=1), 1.5)
+        self.assertEqual(1.5, cache.get(dict(a=1)))
+        self.assertIsNone(cache.get(dict(a=2)))
+
+    def test_least_recently_used(self):
+        cache = CoefficientCache(size=2)
+        cache.set(dict(a=1), 1.)
+        cache.set(dict(a=2), 2.)
+        cache.get(dict(a=1))
+        cache.set(dict(a=3), 3.)
+        self.assertEqual(1., cache.get(dict(a=1)))
+        self.assertIsNone(cache.get(dict(a=2)))
+
+    def test_disk(self):
+        directory = tempfile.mkdtemp()
+        CoefficientCache(directory).set(dict(a=1), 1.5)
+        self.assertEqual(1.5, CoefficientCache(directory).get(dict(a=1)))
+
+
+class TestIntegratorCoefficientCache(unittest.TestCase):
+    def tearDown(self):
+        RateIntegrator.coefficient_cache = None
+
+    def test_hit(self):
+        RateIntegrator.coefficient_cache = CoefficientCache(tempfile.mkdtemp())
+        coefficient = RateIntegrator('charge exchange', 'Li', 40000, 1000, 1).get_coefficient()
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 1)
+        rate.integrate_with_error = None
+        self.assertEqual(coefficient, rate.get_coefficient())
+
+    def test_description(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 2)
+        description = rate.get_description()
+        self.assertEqual('RateIntegrator', description['integrator'])
+        self.assertEqual(2.88e4, description['cross_section']['a1'])
+        self.assertNotEqual(get_key(description),
+                            get_key(RateIntegrator('charge exchange', 'Na', 40000, 1000, 2).get_description()))
+
+    def test_settings_miss(self):
+        RateIntegrator.coefficient_cache = CoefficientCache(tempfile.mkdtemp())
+        coefficient = RateIntegrator('charge exchange', 'Li', 40000, 1000, 1).get_coefficient()
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 1)
+        rate.quad_tolerance = 1e-8
+        rate.integrate_with_error = lambda function: (0.0, 0.0)
+        self.assertNotEqual(coefficient, rate.get_coefficient())
+        for method, dimension, name, value in [('quad', 1, 'tail_tolerance', 1e-14), ('quad', 1, 'laguerre_alpha', 1.5),
+                                               ('gauss', 2, 'laguerre_alpha', 1.5),
+                                               ('gauss', 0, 'isotropic_half_width', 8.0),
+                                               ('quad', 0, 'isotropic_half_width', 8.0)]:
+            rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, dimension, method)
+            description = rate.get_description()
+            setattr(rate, name, value)
+            rate.set_integrator(dimension, method)
+            self.assertNotEqual(get_key(description), get_key(rate.get_description()), msg=method + ' ' + name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import numpy
 import unittest
-from bebim.cross_section import CrossSection
+from bebim.cross_section import CrossSection, get_cross_sections
 from tests.read_reference import read_reference
 
 
@@ -46,5 +46,39 @@ class TestCrossSection(unittest.TestCase):
                                                 err_msg='Cross section test for helium (Q=1)')
 
 
+class TestCrossSectionFunction(unittest.TestCase):
+    def test_threshold(self):
+        c = CrossSection('Li', 0)
+        cross_section = c.get_function()(numpy.array([0., 1., c.B]))
+        numpy.testing.assert_array_equal(cross_section, [0., 0., 0.], err_msg='BEB cross section below threshold')
+
+    def test_above_threshold(self):
+        energy = numpy.logspace(1, 5, 50)
+        c = CrossSection('Li', 0)
+        numpy.testing.assert_array_equal(c.get_function()(energy), c.calculate(energy),
+                                         err_msg='Analytic BEB cross section')
+
+    def test_table(self):
+        energy = numpy.logspace(0, 5, 500)
+        c = CrossSection('Na', 0)
+        numpy.testing.assert_allclose(c.get_table()(energy), c.get_function()(energy), rtol=1e-4, atol=1e-24,
+                                      err_msg='Tabulated BEB cross section')
+
+
+class TestCrossSectionArray(unittest.TestCase):
+    def test_species(self):
+        energy = numpy.logspace(1, 5, 50).reshape(5, 10)
+        species = ['H', 'He', 'Li', 'Na']
+        cross_sections = get_cross_sections(species, energy)
+        self.assertEqual(cross_sections.shape, (4, 5, 10))
+        for s, cross_section in zip(species, cross_sections):
+            numpy.testing.assert_allclose(cross_section, CrossSection(s).calculate(energy), rtol=1e-14)
+
+    def test_ion(self):
+        energy = numpy.logspace(2, 5, 20)
+        numpy.testing.assert_allclose(get_cross_sections('Li', energy, 1, with_Q=False),
+                                      CrossSection('Li', 1, with_Q=False).calculate(energy), rtol=1e-14)
+
+
 if __name__ == '__main__':
     unittest.main()
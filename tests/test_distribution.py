@@ -0,0 +1,43 @@
+import unittest
+import numpy
+import scipy.constants
+
+from sibeira.distribution import Maxwellian
+from sibeira.quadrature import QuasiMonteCarlo
+
+
+class TestMaxwellian(unittest.TestCase):
+    mass = scipy.constants.proton_mass
+
+    def test_temperature_invalid(self):
+        self.assertRaises(ValueError, Maxwellian, 0, self.mass)
+        self.assertRaises(ValueError, Maxwellian, [100, -1, 100], self.mass)
+
+    def test_thermal_speed(self):
+        thermal_speed = Maxwellian([100, 100, 400], self.mass).get_thermal_speed()
+        numpy.testing.assert_allclose(thermal_speed[2], 2.0 * thermal_speed[0])
+        numpy.testing.assert_allclose(thermal_speed[0] ** 2, 100 * scipy.constants.elementary_charge / self.mass)
+
+    def test_sample_moments(self):
+        distribution = Maxwellian([100, 100, 400], self.mass, [0, 1e4, 0])
+        velocity = distribution.sample(QuasiMonteCarlo(2 ** 14, 2).get_points(3))
+        numpy.testing.assert_allclose(numpy.mean(velocity, axis=(1, 2)), [0, 1e4, 0], atol=1e2)
+        numpy.testing.assert_allclose(numpy.std(velocity, axis=(1, 2)), distribution.get_thermal_speed(), rtol=1e-3)
+
+
+class TestQuasiMonteCarlo(unittest.TestCase):
+    def test_sequence_invalid(self):
+        self.assertRaises(ValueError, QuasiMonteCarlo, sequence='random')
+        self.assertRaises(ValueError, QuasiMonteCarlo, scrambles=1)
+
+    def test_points(self):
+        points = QuasiMonteCarlo(2 ** 12, 4).get_points(2)
+        self.assertEqual((2, 4, 2 ** 10), points.shape)
+        self.assertTrue(numpy.all((points > 0) & (points < 1)))
+        self.assertFalse(points.flags.writeable)
+
+    def test_integrate(self):
+        for sequence in ['sobol', 'halton']:
+            value, error = QuasiMonteCarlo(sequence=sequence).integrate(lambda u: u[0] * u[1] ** 2, 2)
+            self.assertLess(abs(value - 1 / 6), 3.0 * error)
+            self.assertLess(error, 1e-3)
@@ -0,0 +1,77 @@
+import concurrent.futures
+import unittest
+import numpy
+
+from sibeira.functional import ImmutableRateProfile, compute_profile, compute_rate, compute_rates, get_dimension
+from sibeira.rate import Rate
+from sibeira.rate_profile import RateProfile
+
+
+class TestComputeRate(unittest.TestCase):
+    def test_rate(self):
+        r = Rate('Li', 40000)
+        r.set_integration_method('gauss')
+        r.set_profiles(100.)
+        self.assertEqual(compute_rate('Li', 40000, 100., 'beb', 2, integration_method='gauss'),
+                         r.get_full_rate_with_beb(2))
+
+    def test_default_dimension(self):
+        self.assertEqual(get_dimension('tabata'), 2)
+        self.assertEqual(get_dimension('nrl'), -1)
+        with self.assertRaises(ValueError):
+            get_dimension('renate')
+
+    def test_rates(self):
+        temperatures = [10., 100., 1000.]
+        reference = [compute_rate('Na', 50000, t, 'tabata', integration_method='gauss') for t in temperatures]
+        numpy.testing.assert_allclose(compute_rates('Na', 50000, temperatures, 'tabata'), reference, rtol=1e-12)
+
+    def test_thread_pool(self):
+        cases = [(species, beam_energy, temperature) for species in ['Li', 'Na'] for beam_energy in [30000, 60000]
+                 for temperature in [20., 200., 2000.]]
+        serial = [compute_rate(*case, 'beb', 2, integration_method='gauss') for case in cases]
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            threaded = list(executor.map(lambda case: compute_rate(*case, 'beb', 2, integration_method='gauss'),
+                                         cases))
+        self.assertEqual(threaded, serial)
+
+
+class TestImmutableRateProfile(unittest.TestCase):
+    temperatures = [10., 30., 100., 300., 1000.]
+    rates = [1e-14, 3e-14, 5e-14, 7e-14, 8e-14]
+
+    def setUp(self):
+        self.profile = ImmutableRateProfile('Li', 40000, 'nrl', -1, self.temperatures, self.rates)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.profile.rates = self.rates
+        with self.assertRaises(AttributeError):
+            del self.profile.spline
+        with self.assertRaises(ValueError):
+            self.profile.rates[0] = 0.0
+
+    def test_rate(self):
+        numpy.testing.assert_allclose(self.profile.get_rate(self.temperatures), self.rates, rtol=1e-12)
+        self.assertEqual(self.profile.get_rate(0.0), 0)
+
+    def test_attenuation(self):
+        r = RateProfile('Li', 40000)
+        radial_coordinates = numpy.linspace(0.6, 0.74, 50)
+        temperatures = numpy.linspace(800., 10., 50)
+        densities = numpy.linspace(2e19, 1e17, 50)
+        reference = r.get_attenuation_from_profile(r.get_spline(self.temperatures, self.rates), radial_coordinates,
+                                                   temperatures, densities)
+        numpy.testing.assert_allclose(self.profile.get_attenuation(radial_coordinates, temperatures, densities),
+                                      reference, rtol=1e-14)
+
+    def test_compute_profile(self):
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            profile = compute_profile('Li', 40000, 'nrl', executor=executor)
+        r = RateProfile('Li', 40000)
+        numpy.testing.assert_allclose(profile.rates, numpy.exp(r.get_nrl_profile().y), rtol=1e-12)
+        self.assertEqual(profile.get_key(), ('Li', 40000.0, 'nrl', -1, 0, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+import unittest
+
+
+def get_import_times(module):
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+    import_times = {}
+    for line in output.splitlines():
+        if line.startswith('import time:') and '|' in line and 'self [us]' not in line:
+            self_time, cumulative_time, name = line[len('import time:'):].split('|')
+            import_times[name.strip()] = (int(self_time), int(cumulative_time))
+    return import_times
+
+
+class TestColdImport(unittest.TestCase):
+    heavy_modules = ['pandas', 'scipy.stats', 'scipy.integrate', 'scipy.interpolate', 'sibeira.integrator',
+                     'sibeira.quadrature', 'bebim.cross_section', 'tabata_ctf.cross_section']
+
+    def assert_lazy(self, module):
+        import_times = get_import_times(module)
+        self.assertIn(module, import_times)
+        loaded = [name for name in self.heavy_modules if name in import_times]
+        self.assertEqual([], loaded, module + ' imports ' + ', '.join(loaded) + ' in ' +
+                         str(import_times[module][1] / 1e6) + ' s')
+
+    def test_rate_profile(self):
+        self.assert_lazy('sibeira.rate_profile')
+
+    def test_rate(self):
+        self.assert_lazy('sibeira.rate')
+
+    def test_instrumentation(self):
+        import_times = get_import_times('sibeira.instrumentation')
+        self.assertNotIn('scipy', import_times)
@@ -0,0 +1,112 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from sibeira import instrumentation
+from sibeira.coefficient_cache import CoefficientCache
+from sibeira.integrator import RateIntegrator
+from sibeira.rate_profile import RateProfile
+from sibeira.rate_profile_io import profile_database_cache
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_disabled(self):
+        self.assertIsNone(instrumentation.recorder)
+        instrumentation.count('anything')
+        with instrumentation.time_stage('anything'):
+            pass
+        self.assertIsNone(instrumentation.recorder)
+
+    def test_recording(self):
+        with instrumentation.recording() as recorder:
+            self.assertIs(recorder, instrumentation.recorder)
+            instrumentation.count('a')
+            instrumentation.count('a', 2)
+            with instrumentation.time_stage('b'):
+                pass
+        self.assertIsNone(instrumentation.recorder)
+        report = recorder.get_report()
+        self.assertEqual(3, report['counters']['a'])
+        self.assertEqual(1, report['timers']['b']['calls'])
+        recorder.clear()
+        self.assertEqual({}, recorder.get_report()['counters'])
+
+    def test_integrator(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 2, 'gauss')
+        reference = rate.get_coefficient()
+        with instrumentation.recording() as recorder:
+            coefficient = rate.get_coefficient()
+        self.assertEqual(reference, coefficient)
+        self.assertNotIn('maxwell', vars(rate))
+        report = recorder.get_report()
+        self.assertEqual(2, report['timers']['integrator/integrand']['calls'])
+        self.assertEqual(48 * 16 + 24 * 8, report['counters']['integrator/integrand/points'])
+        self.assertEqual(1, report['counters']['integrator/gauss'])
+        self.assertLess(report['errors']['integrator/gauss']['maximum'], 1e-2)
+
+    def test_zero_coefficient(self):
+        rate = RateIntegrator('electron impact ionisation', 'Li', 40000, 0.1, 1, 'quad', 'analytic')
+        reference = rate.get_coefficient()
+        self.assertEqual(0.0, reference)
+        with instrumentation.recording() as recorder:
+            self.assertEqual(reference, rate.get_coefficient())
+            recorder.record_error('zero', [0.0, 2.0], [1e-30, 1e-2])
+        self.assertEqual(0.0, recorder.get_report()['errors']['integrator/quad']['maximum'])
+        self.assertEqual(5e-3, recorder.get_report()['errors']['zero']['maximum'])
+
+    def test_coefficient_cache(self):
+        cache = CoefficientCache(tempfile.mkdtemp())
+        with instrumentation.recording() as recorder:
+            cache.get(dict(a=1))
+            cache.set(dict(a=1), 1.0)
+            cache.get(dict(a=1))
+            CoefficientCache(cache.directory).get(dict(a=1))
+        counters = recorder.get_report()['counters']
+        self.assertEqual(1, counters['coefficient_cache/miss'])
+        self.assertEqual(1, counters['coefficient_cache/memory_hit'])
+        self.assertEqual(1, counters['coefficient_cache/disk_hit'])
+
+    def test_profile_database_cache(self):
+        directory = tempfile.mkdtemp()
+        r = RateProfile('Li', 40)
+        r.export_profile('test', 1, r.get_spline([10., 20., 50., 100.], [1., 3., 5., 10.]), directory)
+        profile_database_cache.clear()
+        with instrumentation.recording() as recorder:
+            r.import_profile('test', 1, directory)
+            r.import_profile('test', 1, directory)
+        counters = recorder.get_report()['counters']
+        self.assertEqual(1, counters['profile_database_cache/miss'])
+        self.assertEqual(1, counters['profile_database_cache/hit'])
+        self.assertTrue(os.path.exists(r.get_file_name(directory)))
+
+
+class TestProgress(unittest.TestCase):
+    def test_default(self):
+        r = RateProfile('Li', 40000)
+        r.set_reference_energies([10., 100.])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            r.get_reference_rates('nrl', -1)
+        self.assertEqual('NRL  50%\rNRL 100%\n', output.getvalue())
+
+    def test_callback(self):
+        r = RateProfile('Li', 40000)
+        r.set_reference_energies([10., 100., 1000.])
+        progress = []
+        r.set_progress_callback(lambda *arguments: progress.append(arguments))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            r.get_reference_rates('nrl', -1)
+        self.assertEqual('', output.getvalue())
+        self.assertEqual([('NRL', 1, 3), ('NRL', 2, 3), ('NRL', 3, 3)], progress)
+
+    def test_silent(self):
+        r = RateProfile('Li', 40000)
+        r.set_integration_method('gauss')
+        r.set_progress_callback(None)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            r.get_reference_rates('beb', 2)
+        self.assertEqual('', output.getvalue())
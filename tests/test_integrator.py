@@ -2,9 +2,14 @@ import unittest
 
 import numpy
 import scipy.constants
+import scipy.integrate
+import scipy.special
+import scipy.stats
 
 from sibeira.integrator import RateIntegrator
+from sibeira.integrator_conventional import RateIntegratorConventional
 from sibeira.beam import Beam
+from sibeira.distribution import Maxwellian
 
 
 class TestIntegrator(unittest.TestCase):
@@ -25,6 +30,15 @@ class TestIntegrator(unittest.TestCase):
     def test_target_mass_invalid(self):
         self.assertRaises(ValueError, RateIntegrator, 'charge exchange', 'unknown species', 0, 0)
 
+    def test_cross_section_method_invalid(self):
+        self.assertRaises(ValueError, RateIntegrator, 'charge exchange', 'Li', 0, 0, 2, 'quad', 'unknown method')
+
+    def test_cross_section_table(self):
+        reference = RateIntegrator('charge exchange', 'Li', 40000, 1000, 2, 'gauss', 'analytic').get_coefficient()
+        coefficient = RateIntegrator('charge exchange', 'Li', 40000, 1000, 2, 'gauss', 'table').get_coefficient()
+        numpy.testing.assert_allclose(coefficient, reference, rtol=1e-5,
+                                      err_msg='Tabulated against analytic cross section')
+
 
 class TestIntegratorNormalisation(unittest.TestCase):
     def test_normalisation_1d(self):
@@ -72,5 +86,228 @@ class TestIntegratorSpeed(unittest.TestCase):
                                           err_msg='1D normalisation factor')
 
 
+class TestIntegratorIsotropic(unittest.TestCase):
+    @staticmethod
+    def get_mean_relative_speed(rate):
+        thermal_speed = rate.maxwell_normalisation_factor
+        u = rate.beam_speed / thermal_speed
+        return thermal_speed * ((u + 1.0 / u) * scipy.special.erf(u / numpy.sqrt(2.0)) +
+                                numpy.sqrt(2.0 / numpy.pi) * numpy.exp(-0.5 * u ** 2))
+
+    def test_normalisation_0d(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0)
+        normalisation_factor = rate.integrate(rate.integrand_normalisation)
+        numpy.testing.assert_array_almost_equal(normalisation_factor, 1, decimal=6,
+                                                err_msg='0D normalisation factor')
+
+    def test_mean_relative_speed(self):
+        for method in ['quad', 'gauss']:
+            rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0, method)
+            rate.cross_section = TestIntegratorSpeed.one
+            numpy.testing.assert_approx_equal(rate.get_coefficient(), self.get_mean_relative_speed(rate),
+                                              significant=6, err_msg='Isotropic mean relative speed (' + method + ')')
+
+    def test_conventional(self):
+        reference = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0).get_coefficient()
+        coefficient = RateIntegratorConventional('charge exchange', 'Li', 40000, 1000, 0).get_coefficient()
+        numpy.testing.assert_allclose(coefficient, reference, rtol=1e-6,
+                                      err_msg='Isotropic coefficient of the conventional integrator')
+
+    def test_isotropic_average(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0)
+        thermal_speed = rate.maxwell_normalisation_factor
+        v = numpy.linspace(0, 14, 2001)[:, numpy.newaxis]
+        cosine = numpy.linspace(-1, 1, 1001)
+        velocity = rate.get_third_side_length(v * thermal_speed, rate.beam_speed, numpy.arccos(cosine))
+        integrand = 0.5 * rate.maxwell(v) * velocity * rate.cross_section(rate.get_impact_energy(velocity))
+        reference = scipy.integrate.simpson(scipy.integrate.simpson(integrand, x=cosine, axis=1), x=v[:, 0])
+        numpy.testing.assert_allclose(rate.get_coefficient(), reference, rtol=1e-4,
+                                      err_msg='Isotropic coefficient against the direct angular average')
+
+    def test_gauss(self):
+        reference = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0).get_coefficient()
+        coefficient = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0, 'gauss').get_coefficient()
+        numpy.testing.assert_allclose(coefficient, reference, rtol=1e-3,
+                                      err_msg='Isotropic coefficient on Gauss grid')
+
+    def test_batch(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 100, 0, 'gauss')
+        coefficients = rate.get_coefficients([100., 1000.], [40000., 60000.])
+        reference = [[RateIntegrator('charge exchange', 'Li', e, t, 0, 'gauss').get_coefficient()
+                      for e in [40000., 60000.]] for t in [100., 1000.]]
+        numpy.testing.assert_allclose(coefficients, reference, rtol=1e-12, err_msg='Batched isotropic coefficients')
+
+
+class TestIntegratorDomain(unittest.TestCase):
+    def test_speed_upper_bound(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 1)
+        self.assertAlmostEqual(rate.tail_tolerance, scipy.stats.chi.sf(rate.get_speed_upper_bound(), 4), delta=1e-15)
+
+    def test_threshold_speed(self):
+        rate = RateIntegrator('electron impact ionisation', 'Li', 40000, 100, 1)
+        velocity = rate.get_threshold_speed() * rate.maxwell_normalisation_factor
+        self.assertAlmostEqual(rate.get_cross_section_model().get_threshold(), rate.get_impact_energy(velocity))
+        self.assertEqual([rate.get_threshold_speed()], rate.get_speed_options(None)['points'])
+
+    def test_angle_breakpoints(self):
+        rate = RateIntegrator('electron impact ionisation', 'Li', 40000, 10, 2)
+        v = rate.get_threshold_speed() * 1.01
+        for alpha in rate.get_angle_options(None, 1.0, v)['points']:
+            velocity = rate.get_third_side_length(v * rate.maxwell_normalisation_factor, rate.beam_speed, alpha)
+            self.assertAlmostEqual(rate.get_cross_section_model().get_threshold(), rate.get_impact_energy(velocity))
+
+    def test_quad_tolerance(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 1)
+        rate.quad_tolerance = 1e-4
+        v = numpy.linspace(0, 12, 200001)
+        reference = scipy.integrate.simpson(rate.integrand(v), x=v) / \
+            scipy.integrate.simpson(rate.integrand_normalisation(v), x=v)
+        numpy.testing.assert_allclose(rate.get_coefficient(), reference, rtol=1e-4)
+
+    def test_conventional_1d(self):
+        reference = RateIntegratorConventional('charge exchange', 'Li', 40000, 1000, 1, 'gauss').get_coefficient()
+        coefficient = RateIntegratorConventional('charge exchange', 'Li', 40000, 1000, 1).get_coefficient()
+        numpy.testing.assert_allclose(coefficient, reference, rtol=1e-3,
+                                      err_msg='1D coefficient of the conventional integrator in SI velocities')
+
+
+class TestIntegratorQuasiMonteCarlo(unittest.TestCase):
+    def test_sample_budget_invalid(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 3, 'gauss')
+        self.assertRaises(ValueError, rate.set_sample_budget, 1024)
+
+    def test_charge_exchange_3d(self):
+        reference = RateIntegrator('charge exchange', 'Li', 40000, 1000, 3, 'gauss').get_coefficient()
+        coefficient, error = RateIntegrator('charge exchange', 'Li', 40000, 1000, 3, 'qmc')\
+            .get_coefficient_with_error()
+        self.assertLess(error / coefficient, 1e-3)
+        numpy.testing.assert_allclose(coefficient, reference, rtol=1e-3)
+
+    def test_isotropic(self):
+        reference = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0).get_coefficient()
+        coefficient, error = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0, 'qmc')\
+            .get_coefficient_with_error()
+        self.assertLess(abs(coefficient - reference), 3.0 * error)
+
+    def test_conventional(self):
+        reference = RateIntegratorConventional('charge exchange', 'Li', 40000, 1000, 2, 'gauss').get_coefficient()
+        coefficient = RateIntegratorConventional('charge exchange', 'Li', 40000, 1000, 2, 'qmc').get_coefficient()
+        numpy.testing.assert_allclose(coefficient, reference, rtol=1e-3)
+
+    def test_sample_budget(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 3, 'qmc')
+        rate.set_sample_budget(2 ** 10)
+        coarse_error = rate.get_coefficient_with_error()[1]
+        rate.set_sample_budget(2 ** 16)
+        self.assertLess(rate.get_coefficient_with_error()[1], coarse_error)
+
+    def test_drifting_maxwellian(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0, 'qmc')
+        rate.set_distribution(Maxwellian(1000, rate.target_mass, [0, 0, 0.5 * rate.beam_speed]))
+        reference = RateIntegrator('charge exchange', 'Li', 10000, 1000, 0, 'qmc').get_coefficient()
+        numpy.testing.assert_allclose(rate.get_coefficient(), reference, rtol=1e-10)
+
+    def test_fast_drifting_maxwellian(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40, 10, 0, 'qmc')
+        drift_speed = 1e6
+        rate.set_distribution(Maxwellian(10, rate.target_mass, [0, 0, -drift_speed]))
+        coefficient, error = rate.get_coefficient_with_error()
+        self.assertTrue(numpy.isfinite(coefficient) and numpy.isfinite(error))
+        beam_energy = Beam('Li', 0).get_mass() * (drift_speed + rate.beam_speed) ** 2 / \
+            (2.0 * scipy.constants.elementary_charge)
+        reference = RateIntegrator('charge exchange', 'Li', beam_energy, 10, 3, 'quad').get_coefficient()
+        numpy.testing.assert_allclose(coefficient, reference, rtol=1e-2)
+        isotropic = RateIntegrator('charge exchange', 'Li', beam_energy, 10, 0, 'gauss').get_coefficient()
+        numpy.testing.assert_allclose(coefficient, isotropic, rtol=1e-3)
+
+    def test_anisotropic_maxwellian(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 1000, 0, 'qmc')
+        reference = rate.get_coefficient()
+        rate.set_distribution(Maxwellian([1000, 1000, 1000], rate.target_mass))
+        numpy.testing.assert_allclose(rate.get_coefficient(), reference, rtol=1e-12)
+        rate.set_distribution(Maxwellian([1000, 1000, 10], rate.target_mass))
+        self.assertNotAlmostEqual(1.0, rate.get_coefficient() / reference, places=3)
+
+
+class TestIntegratorBatch(unittest.TestCase):
+    temperatures = [10., 100., 1000., 20000.]
+    beam_energies = [20000., 40000., 80000.]
+
+    def assert_batch_equal(self, reaction_name, dimension):
+        rate = RateIntegrator(reaction_name, 'Li', 40000, 100, dimension, 'gauss')
+        coefficients = rate.get_coefficients(self.temperatures, self.beam_energies)
+        reference = [[RateIntegrator(reaction_name, 'Li', e, t, dimension, 'gauss').get_coefficient()
+                      for e in self.beam_energies] for t in self.temperatures]
+        self.assertEqual((len(self.temperatures), len(self.beam_energies)), coefficients.shape)
+        numpy.testing.assert_allclose(coefficients, reference, rtol=1e-12,
+                                      err_msg='Batched coefficients (' + str(dimension) + 'D)')
+
+    def test_electron_impact_ionisation_1d(self):
+        self.assert_batch_equal('electron impact ionisation', 1)
+
+    def test_qmc(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 100, 2, 'qmc')
+        reference = [[RateIntegrator('charge exchange', 'Li', e, t, 2, 'qmc').get_coefficient()
+                      for e in self.beam_energies] for t in self.temperatures]
+        numpy.testing.assert_allclose(rate.get_coefficients(self.temperatures, self.beam_energies), reference,
+                                      rtol=1e-12)
+
+    def test_quad(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 100, 1)
+        reference = [[RateIntegrator('charge exchange', 'Li', e, t, 1).get_coefficient()
+                      for e in self.beam_energies] for t in self.temperatures]
+        numpy.testing.assert_array_equal(rate.get_coefficients(self.temperatures, self.beam_energies), reference)
+
+    def test_isotropic_qmc(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 100, 0, 'qmc')
+        self.assertRaises(ValueError, rate.get_coefficients, self.temperatures, self.beam_energies)
+
+    def test_charge_exchange_2d(self):
+        self.assert_batch_equal('charge exchange', 2)
+
+    def test_charge_exchange_3d(self):
+        self.assert_batch_equal('charge exchange', 3)
+
+    def test_instance_unchanged(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40000, 100, 2)
+        rate.get_coefficients(self.temperatures, self.beam_energies)
+        self.assertEqual(100, rate.temperature)
+        self.assertEqual('quad', rate.method)
+
+
+class TestIntegratorGauss(unittest.TestCase):
+    def test_method_invalid(self):
+        self.assertRaises(ValueError, RateIntegrator, 'charge exchange', 'Li', 0, 0, 2, 'unknown method')
+
+    def test_normalisation_2d(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40, 100, 2, 'gauss')
+        normalisation_factor = rate.integrate(rate.integrand_normalisation)
+        numpy.testing.assert_approx_equal(normalisation_factor, rate.get_normalisation(), significant=12,
+                                          err_msg='2D normalisation factor on Gauss grid')
+
+    def test_normalisation_3d(self):
+        rate = RateIntegrator('charge exchange', 'Li', 40, 100, 3, 'gauss')
+        normalisation_factor = rate.integrate(rate.integrand_normalisation)
+        numpy.testing.assert_approx_equal(normalisation_factor, 2.0*scipy.constants.pi**2, significant=12,
+                                          err_msg='3D normalisation factor on Gauss grid')
+
+    def test_mean_speed_2d(self):
+        temperature = 100
+        rate = RateIntegrator('electron impact ionisation', 'Li', 40, temperature, 2, 'gauss')
+        rate.cross_section = TestIntegratorSpeed.one
+        mean_speed = rate.get_coefficient()
+        expected = numpy.sqrt(8.0 * scipy.constants.e * temperature / scipy.constants.pi / scipy.constants.electron_mass)
+        numpy.testing.assert_approx_equal(mean_speed, expected, significant=4,
+                                          err_msg='2D mean speed on Gauss grid')
+
+    def test_charge_exchange_2d(self):
+        reference = RateIntegrator('charge exchange', 'Li', 40000, 1000, 2).get_coefficient()
+        coefficient, error = RateIntegrator('charge exchange', 'Li', 40000, 1000, 2, 'gauss')\
+            .get_coefficient_with_error()
+        numpy.testing.assert_allclose(coefficient, reference, rtol=5e-3,
+                                      err_msg='2D charge exchange coefficient on Gauss grid')
+        self.assertLess(error, 1e-2 * coefficient, msg='2D charge exchange error estimate')
+
+
 if __name__ == '__main__':
     unittest.main()
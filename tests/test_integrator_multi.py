@@ -0,0 +1,53 @@
+import unittest
+
+import numpy
+
+from sibeira.integrator import RateIntegrator
+from sibeira.integrator_multi import MultiReactionIntegrator, get_reaction_term
+
+
+class TestMultiReactionIntegrator(unittest.TestCase):
+    channels = [('electron impact ionisation', 1.0, 1), ('charge exchange', 1.0, 2),
+                ('double charge exchange', 2.0, 2)]
+
+    def get_integrator(self, method='gauss'):
+        terms = [get_reaction_term(reaction_name, 'Li', weight, dimension)
+                 for reaction_name, weight, dimension in self.channels]
+        return MultiReactionIntegrator('Li', 40000, 1000., terms, method)
+
+    def get_separate_coefficients(self, method='gauss'):
+        return [RateIntegrator(reaction_name, 'Li', 40000, 1000., dimension, method).get_coefficient()
+                for reaction_name, weight, dimension in self.channels]
+
+    def test_shared_target_groups(self):
+        integrator = self.get_integrator()
+        self.assertEqual(len(integrator.integrators), 2)
+        self.assertEqual(integrator.integrators[1][1], [1, 2])
+
+    def test_channels_gauss(self):
+        coefficients = self.get_integrator().get_channel_coefficients()
+        self.assertEqual(list(coefficients.keys()), [reaction_name for reaction_name, _, _ in self.channels])
+        numpy.testing.assert_allclose(list(coefficients.values()), self.get_separate_coefficients(), rtol=1e-12)
+
+    def test_channels_qmc(self):
+        values = self.get_integrator('qmc').get_channel_coefficients_with_error()[0]
+        numpy.testing.assert_allclose(values, self.get_separate_coefficients('qmc'), rtol=1e-12)
+
+    def test_total(self):
+        separate = self.get_separate_coefficients()
+        value, error = self.get_integrator().get_coefficient_with_error()
+        self.assertAlmostEqual(value / (separate[0] + separate[1] + 2.0 * separate[2]), 1.0, 12)
+        self.assertGreater(error, 0.0)
+
+    def test_quad(self):
+        with self.assertRaises(ValueError):
+            self.get_integrator('quad')
+
+    def test_duplicate_reaction(self):
+        term = get_reaction_term('charge exchange', 'Li')
+        with self.assertRaises(ValueError):
+            MultiReactionIntegrator('Li', 40000, 1000., [term, term])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+import numpy
+
+from sibeira.log_table import LogTable
+
+
+class TestLogTable(unittest.TestCase):
+    def test_log_linear(self):
+        table = LogTable(numpy.log, 1.0, 1e6, 101)
+        energy = numpy.logspace(0, 6, 333)
+        numpy.testing.assert_allclose(table(energy), numpy.log(energy), rtol=1e-12, atol=1e-12)
+
+    def test_below_minimum(self):
+        table = LogTable(numpy.sqrt, 4.0, 1e4, 101)
+        numpy.testing.assert_allclose(table(numpy.array([0.0, 1.0, 4.0])), [2.0, 2.0, 2.0], rtol=1e-12)
+
+    def test_above_maximum(self):
+        table = LogTable(numpy.sqrt, 1.0, 1e4, 101)
+        numpy.testing.assert_allclose(table(1e6), 100.0, rtol=1e-12)
+
+    def test_shape(self):
+        table = LogTable(numpy.sqrt, 1.0, 1e4, 101)
+        self.assertEqual((3, 4), table(numpy.full((3, 4), 9.0)).shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import contextlib
+import io
+import tempfile
+import unittest
+import unittest.mock
+import numpy
+
+from sibeira.precompute import compute_entry, get_entries, get_missing_entries, main, precompute, store_entry
+from sibeira.rate_profile import RateProfile
+
+
+class TestPrecompute(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_entries(self):
+        entries = get_entries(['Li'], [40.], ['nrl', 'tabata'], [-1, 2])
+        self.assertEqual(entries, [('Li', 40000., 'nrl', -1), ('Li', 40000., 'nrl', 2), ('Li', 40000., 'tabata', 2)])
+
+    def test_dry_run(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(['--species', 'Li', '--beam-energies', '40', '--models', 'nrl', '--dimensions', '-1',
+                           '--destination', self.directory.name, '--dry-run'])
+        self.assertEqual(status, 0)
+        self.assertEqual(output.getvalue().splitlines(), ['1 of 1 profiles are missing', 'Li 40.0 keV nrl'])
+        self.assertEqual(len(get_missing_entries([('Li', 40000., 'nrl', -1)], self.directory.name)), 1)
+
+    def test_resume(self):
+        for storage in ['pickle', 'columnar']:
+            entries = get_entries(['Li'], [40.], ['nrl', 'beb'], [-1, 2])
+            store_entry(entries[0], compute_entry(entries[0]), self.directory.name, storage)
+            missing_entries = get_missing_entries(entries, self.directory.name, storage)
+            self.assertEqual(missing_entries, entries[1:])
+            with contextlib.redirect_stdout(io.StringIO()):
+                failed = precompute(missing_entries, self.directory.name, storage, 'gauss', workers=1)
+            self.assertEqual(failed, [])
+            self.assertEqual(get_missing_entries(entries, self.directory.name, storage), [])
+
+    def test_attenuation_from_precomputed_profile(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = main(['--species', 'Li', '--beam-energies', '40', '--models', 'nrl', '--dimensions', '-1',
+                           '--destination', self.directory.name, '--workers', '1'])
+        self.assertEqual(status, 0)
+        r = RateProfile('Li', 40000.)
+        r.set_destination_directory(self.directory.name)
+        radial_coordinates = numpy.linspace(0.74, 0.6, 20)
+        temperatures = numpy.linspace(10., 800., 20)
+        densities = numpy.linspace(1e17, 2e19, 20)
+        with unittest.mock.patch.object(RateProfile, 'get_reference_profile') as get_reference_profile:
+            attenuation = r.get_attenuation(radial_coordinates, temperatures, densities, 'nrl')
+        get_reference_profile.assert_not_called()
+        numpy.testing.assert_array_equal(attenuation, r.get_attenuation_from_profile(
+            compute_entry(('Li', 40000., 'nrl', -1)), radial_coordinates, temperatures, densities))
+
+    def test_failure(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            failed = precompute([('Li', 40000., 'renate', -1)], self.directory.name, workers=1)
+        self.assertEqual(failed, [('Li', 40000., 'renate', -1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ import scipy.constants
 import unittest
 
 from sibeira.beam import Beam
+from sibeira.rate import Rate
 
 
 class TestRate(unittest.TestCase):
@@ -20,6 +21,56 @@ class TestRate(unittest.TestCase):
         return Beam('D', 0).get_mass()
 
 
+class TestRateBatch(unittest.TestCase):
+    temperatures = [10., 100., 1000.]
+
+    def get_point_rates(self, rate, get_full_rate, tabata_integration_dimension):
+        reference = []
+        for temperature in self.temperatures:
+            rate.set_profiles(temperature)
+            reference.append(get_full_rate(tabata_integration_dimension))
+        return reference
+
+    def test_nrl_with_tabata(self):
+        r = Rate('Li', 40000)
+        r.set_integration_method('gauss')
+        reference = self.get_point_rates(r, r.get_full_rate_with_nrl, 2)
+        numpy.testing.assert_allclose(r.get_full_rates_with_nrl(self.temperatures, 2), reference, rtol=1e-12)
+
+    def test_beb_with_tabata(self):
+        r = Rate('Li', 40000)
+        r.set_integration_method('gauss')
+        reference = self.get_point_rates(r, r.get_full_rate_with_beb, 2)
+        numpy.testing.assert_allclose(r.get_full_rates_with_beb(self.temperatures, 2), reference, rtol=1e-12)
+
+    def test_double_charge_exchange(self):
+        r = Rate('Li', 40000)
+        r.set_integration_method('gauss')
+        single = self.get_point_rates(r, r.get_full_rate_with_beb, 2)
+        r.set_double_charge_exchange()
+        reference = self.get_point_rates(r, r.get_full_rate_with_beb, 2)
+        self.assertTrue(all(numpy.greater(reference, single)))
+        numpy.testing.assert_allclose(r.get_full_rates_with_beb(self.temperatures, 2), reference, rtol=1e-12)
+
+    def test_tabata(self):
+        r = Rate('Li', 40000)
+        r.set_integration_method('gauss')
+        reference = self.get_point_rates(r, r.get_full_rate_with_tabata, 1)
+        numpy.testing.assert_allclose(r.get_full_rates_with_tabata(self.temperatures, 1), reference, rtol=1e-12)
+
+    def test_qmc(self):
+        r = Rate('Li', 40000)
+        r.set_integration_method('qmc')
+        reference = self.get_point_rates(r, r.get_full_rate_with_tabata, 2)
+        numpy.testing.assert_allclose(r.get_full_rates_with_tabata(self.temperatures, 2), reference, rtol=1e-12)
+
+    def test_quad(self):
+        r = Rate('Li', 40000)
+        reference = self.get_point_rates(r, r.get_full_rate_with_tabata, 1)
+        numpy.testing.assert_array_equal(r.get_full_rates_with_tabata(self.temperatures, 1), reference)
+        r.set_integration_method('gauss')
+        self.assertFalse(numpy.array_equal(r.get_full_rates_with_tabata(self.temperatures, 1), reference))
+
 if __name__ == '__main__':
     unittest.main()
 
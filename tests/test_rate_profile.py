@@ -1,3 +1,4 @@
+import concurrent.futures
 import unittest
 import numpy
 
@@ -24,6 +25,234 @@ class TestRateProfileSpline(unittest.TestCase):
         result = r.resolve_log_spline(s, 11.)
         numpy.testing.assert_array_almost_equal([1.2481484271391177], result, decimal=4, err_msg='spline test for 11')
 
+    def test_spline_for_array(self):
+        r = RateProfile('Li', 40)
+        s = r.get_spline([10, 20, 50, 100], [1, 3, 5, 10])
+        x = numpy.array([[0., 1.1, 11.], [-5., 50., 100.]])
+        result = r.resolve_log_spline(s, x)
+        reference = [[r.resolve_log_spline(s, i) for i in row] for row in x]
+        self.assertEqual(x.shape, result.shape)
+        numpy.testing.assert_allclose(result, reference, rtol=1e-14, err_msg='spline test for 2D array')
+
+    def test_spline_for_non_positive(self):
+        r = RateProfile('Li', 40)
+        s = r.get_spline([10, 20, 50, 100], [1, 3, 5, 10])
+        numpy.testing.assert_array_equal([0., 0., 0.], r.resolve_log_spline(s, [0., -1., -0.]))
+
+
+class TestRateProfileBatch(unittest.TestCase):
+    def test_gauss_profile(self):
+        r = RateProfile('Li', 40000)
+        r.set_integration_method('gauss')
+        r.set_beb_profile(2)
+        r.set_profiles(100.)
+        reference = r.get_full_rate_with_beb(2)
+        numpy.testing.assert_allclose(r.resolve_log_spline(r.beb_spline, 100.), reference, rtol=1e-12)
+
+
+class TestRateProfileRefinement(unittest.TestCase):
+    def setUp(self):
+        self.r = RateProfile('Li', 40000)
+        self.r.set_integration_method('gauss')
+        self.r.set_reference_energies([10., 100., 1000., 10000.])
+
+    def test_without_tolerance(self):
+        profile = self.r.get_beb_profile(2)
+        numpy.testing.assert_allclose(numpy.exp(profile.x), self.r.reference_energies)
+        self.assertFalse(hasattr(profile, 'error'))
+
+    def test_tolerance(self):
+        self.r.set_refinement_tolerance(1e-3)
+        profile = self.r.get_beb_profile(2)
+        temperatures = numpy.exp(profile.x)
+        self.assertLessEqual(profile.error, 1e-3)
+        self.assertGreater(temperatures.size, 4)
+        self.assertTrue(numpy.all(numpy.diff(temperatures) > 0))
+        numpy.testing.assert_allclose(temperatures[[0, -1]], [10., 10000.])
+        test_temperatures = numpy.geomspace(12., 9000., 9)
+        numpy.testing.assert_allclose(self.r.resolve_log_spline(profile, test_temperatures),
+                                      self.r.get_full_rates_with_beb(test_temperatures, 2), rtol=5e-3)
+
+    def test_maximum_size(self):
+        self.r.set_refinement_tolerance(1e-9, 6)
+        profile = self.r.get_beb_profile(2)
+        self.assertEqual(profile.x.size, 6)
+        self.assertGreater(profile.error, 1e-9)
+
+    def test_error_bound(self):
+        for tolerance, maximum_reference_size in [(1e-3, 64), (1e-9, 6)]:
+            self.r.set_refinement_tolerance(tolerance, maximum_reference_size)
+            profile = self.r.get_beb_profile(2)
+            temperatures = numpy.exp(profile.x)
+            midpoints = numpy.sqrt(temperatures[1:] * temperatures[:-1])
+            errors = numpy.abs(self.r.resolve_log_spline(profile, midpoints) /
+                               self.r.get_full_rates_with_beb(midpoints, 2) - 1.0)
+            self.assertAlmostEqual(numpy.max(errors), profile.error, delta=1e-12)
+
+
+class TestRateProfileAttenuation(unittest.TestCase):
+    radial_coordinates = numpy.linspace(0.6, 0.74, 50)
+    temperatures = numpy.array([numpy.linspace(t, 10., 50) for t in [500., 800., 1000.]])
+    densities = numpy.array([numpy.linspace(n, 1e17, 50) for n in [1e19, 2e19, 3e19]])
+
+    def setUp(self):
+        self.r = RateProfile('Li', 40000)
+        self.profile = self.r.get_spline([10., 30., 100., 300., 1000.], [1e-14, 3e-14, 5e-14, 7e-14, 8e-14])
+        self.r.import_profile = lambda profile_name, tabata_integration_dimension: self.profile
+
+    def get_reference(self):
+        return [self.r.get_attenuation(self.radial_coordinates, t, n, 'nrl')
+                for t, n in zip(self.temperatures, self.densities)]
+
+    def test_time_resolved(self):
+        attenuation = self.r.get_attenuation(self.radial_coordinates, self.temperatures, self.densities, 'nrl')
+        self.assertEqual(self.temperatures.shape, attenuation.shape)
+        numpy.testing.assert_allclose(attenuation, self.get_reference(), rtol=1e-14)
+
+    def test_stream(self):
+        time_slices = zip(self.temperatures, self.densities)
+        attenuation = list(self.r.iterate_attenuation(self.radial_coordinates, time_slices, 'nrl', chunk_size=2))
+        numpy.testing.assert_allclose(attenuation, self.get_reference(), rtol=1e-14)
+
+    def test_nrl(self):
+        r = RateProfile('Li', 40000)
+        profile = r.get_nrl_profile()
+        reference = r.get_attenuation_from_profile(profile, self.radial_coordinates, self.temperatures, self.densities)
+        attenuation = r.get_nrl_attenuation(self.radial_coordinates, self.temperatures, self.densities)
+        self.assertEqual(self.temperatures.shape, attenuation.shape)
+        numpy.testing.assert_allclose(attenuation, reference, rtol=1e-4)
+
+
+class TestRateProfileJacobian(unittest.TestCase):
+    radial_coordinates = numpy.linspace(0.6, 0.74, 20)
+    temperatures = numpy.linspace(800., 10., 20)
+    densities = numpy.linspace(2e19, 1e17, 20)
+
+    def setUp(self):
+        self.r = RateProfile('Li', 40000)
+        self.profile = self.r.get_spline([10., 30., 100., 300., 1000.], [1e-14, 3e-14, 5e-14, 7e-14, 8e-14])
+
+    def get_attenuation(self, temperatures, densities):
+        return self.r.get_attenuation_from_profile(self.profile, self.radial_coordinates, temperatures, densities)
+
+    def get_finite_differences(self, values, get_attenuation):
+        jacobian = numpy.zeros((values.size, values.size))
+        for k in range(values.size):
+            step = numpy.zeros_like(values)
+            step[k] = 1e-5 * values[k]
+            jacobian[:, k] = (get_attenuation(values + step) - get_attenuation(values - step)) / (2.0 * step[k])
+        return jacobian
+
+    def test_jacobians(self):
+        attenuation, density_jacobian, temperature_jacobian = self.r.get_attenuation_with_jacobians_from_profile(
+            self.profile, self.radial_coordinates, self.temperatures, self.densities)
+        numpy.testing.assert_allclose(attenuation, self.get_attenuation(self.temperatures, self.densities))
+        numpy.testing.assert_array_equal(numpy.triu(density_jacobian, 1), 0.0)
+        reference = self.get_finite_differences(self.densities, lambda n: self.get_attenuation(self.temperatures, n))
+        numpy.testing.assert_allclose(density_jacobian, reference, atol=1e-6 * numpy.abs(reference).max())
+        reference = self.get_finite_differences(self.temperatures, lambda t: self.get_attenuation(t, self.densities))
+        numpy.testing.assert_allclose(temperature_jacobian, reference, atol=1e-6 * numpy.abs(reference).max())
+
+    def test_vector_jacobian_product(self):
+        temperatures = numpy.array([self.temperatures, 0.5 * self.temperatures])
+        temperatures[1, -1] = 0.0
+        densities = numpy.array([self.densities, 2.0 * self.densities])
+        cotangent = numpy.random.default_rng(0).normal(size=densities.shape)
+        _, density_jacobian, temperature_jacobian = self.r.get_attenuation_with_jacobians_from_profile(
+            self.profile, self.radial_coordinates, temperatures, densities)
+        self.assertEqual(density_jacobian.shape, (2, 20, 20))
+        attenuation, density_vjp, temperature_vjp = self.r.get_attenuation_vjp_from_profile(
+            self.profile, self.radial_coordinates, temperatures, densities, cotangent)
+        numpy.testing.assert_allclose(attenuation, self.get_attenuation(temperatures, densities))
+        numpy.testing.assert_allclose(density_vjp, numpy.einsum('ti,tik->tk', cotangent, density_jacobian))
+        numpy.testing.assert_allclose(temperature_vjp, numpy.einsum('ti,tik->tk', cotangent, temperature_jacobian))
+        self.assertEqual(temperature_vjp[1, -1], 0.0)
+
+
+class TestRateProfileDensity(unittest.TestCase):
+    radial_coordinates = numpy.linspace(0.74, 0.6, 100)
+    temperatures = numpy.array([numpy.linspace(10., 800., 100), numpy.linspace(20., 1500., 100)])
+    densities = numpy.array([1e17 + 2e19 * numpy.linspace(0., 1., 100) ** 2,
+                             5e17 + 4e19 * numpy.linspace(0., 1., 100) ** 1.5])
+
+    def setUp(self):
+        self.r = RateProfile('Li', 40000)
+        self.profile = self.r.get_spline([10., 30., 100., 300., 1000.], [1e-13, 3e-13, 5e-13, 7e-13, 8e-13])
+        self.attenuation = self.r.get_attenuation_from_profile(self.profile, self.radial_coordinates,
+                                                               self.temperatures, self.densities)
+
+    def get_density(self, attenuation, edge_density=None, regularisation=None):
+        return self.r.get_density_from_profile(self.profile, self.radial_coordinates, self.temperatures, attenuation,
+                                               edge_density, regularisation)
+
+    def test_edge_density(self):
+        numpy.testing.assert_allclose(self.get_density(self.attenuation, self.densities[:, 0]), self.densities,
+                                      rtol=1e-9)
+
+    def test_unknown_edge_density(self):
+        error = numpy.abs(self.get_density(self.attenuation) / self.densities - 1.0)
+        self.assertLess(numpy.median(error), 1e-3)
+
+    def test_single_slice(self):
+        density = self.r.get_density_from_profile(self.profile, self.radial_coordinates, self.temperatures[0],
+                                                  self.attenuation[0], regularisation=1e-10)
+        numpy.testing.assert_allclose(density[10:], self.densities[0, 10:], rtol=1e-2)
+
+    def test_regularisation(self):
+        noisy_attenuation = self.attenuation * (1.0 + 1e-4 * numpy.random.default_rng(1).normal(size=(2, 100)))
+        marched_error = numpy.abs(self.get_density(noisy_attenuation, self.densities[:, 0]) / self.densities - 1.0)
+        regularised_error = numpy.abs(self.get_density(noisy_attenuation, regularisation=1e-2) / self.densities - 1.0)
+        self.assertLess(numpy.median(regularised_error), 1e-2)
+        self.assertLess(numpy.median(regularised_error), 0.1 * numpy.median(marched_error))
+
+    def test_regularisation_with_edge_density(self):
+        density = self.get_density(self.attenuation, self.densities[:, 0], 1e-10)
+        numpy.testing.assert_array_equal(density[:, 0], self.densities[:, 0])
+        numpy.testing.assert_allclose(density, self.densities, rtol=1e-2)
+        density = self.r.get_density_from_profile(self.profile, self.radial_coordinates, self.temperatures[0],
+                                                  self.attenuation[0], self.densities[0, 0], 1e-10)
+        numpy.testing.assert_allclose(density, self.densities[0], rtol=1e-2)
+
+    def test_stream(self):
+        self.r.import_profile = lambda profile_name, tabata_integration_dimension: self.profile
+        density = list(self.r.iterate_density(self.radial_coordinates, zip(self.temperatures, self.attenuation), 'nrl',
+                                              chunk_size=1))
+        numpy.testing.assert_allclose(density, self.get_density(self.attenuation), rtol=1e-14)
+
+    def test_light(self):
+        emission = numpy.linspace(1.0, 2.0, 100)
+        light = 3.0 * emission * self.densities * self.attenuation
+        density = self.r.get_density_from_light_and_profile(self.profile, self.radial_coordinates, self.temperatures,
+                                                            light, self.densities[:, 0], emission)
+        numpy.testing.assert_allclose(density, self.densities, rtol=1e-9)
+        with self.assertRaises(ValueError):
+            self.r.get_density_from_light_and_profile(self.profile, self.radial_coordinates, self.temperatures,
+                                                      light, 0.0)
+        for invalid_light in [0.0, -1.0, numpy.nan]:
+            corrupted_light = light.copy()
+            corrupted_light[0, 50] = invalid_light
+            with self.assertRaises(ValueError):
+                self.r.get_density_from_light_and_profile(self.profile, self.radial_coordinates, self.temperatures,
+                                                          corrupted_light, self.densities[:, 0], emission)
+
+    def test_light_without_solution(self):
+        light = self.densities * self.attenuation
+        light[:, 50:] *= 1e3
+        density = self.r.get_density_from_light_and_profile(self.profile, self.radial_coordinates, self.temperatures,
+                                                            light, self.densities[:, 0])
+        numpy.testing.assert_allclose(density[:, :50], self.densities[:, :50], rtol=1e-9)
+        self.assertTrue(numpy.all(numpy.isnan(density[:, 50])))
+
+
+class TestRateProfileParallel(unittest.TestCase):
+    def test_process_pool(self):
+        r = RateProfile('Li', 40000)
+        r.set_reference_energies([10., 100., 1000.])
+        serial_rates = r.get_reference_rates('nrl', 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            parallel_rates = r.get_reference_rates('nrl', 1, executor)
+        numpy.testing.assert_array_equal(serial_rates, parallel_rates, err_msg='Parallel reference rates')
+
 
 if __name__ == '__main__':
     unittest.main()
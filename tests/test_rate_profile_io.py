@@ -1,7 +1,12 @@
+import os
 import tempfile
 import unittest
+import unittest.mock
+import numpy
 
 from sibeira.rate_profile import RateProfile
+from sibeira.rate_profile_io import profile_database_cache
+from sibeira.rate_profile_store import ColumnarProfileStore, convert_pickle_database
 
 
 class TestRateProfileIO(unittest.TestCase):
@@ -87,5 +92,117 @@ class TestRateProfileIO(unittest.TestCase):
         self.assertEqual(reference, result, msg='Test file name')
 
 
+class TestProfileDatabaseCache(unittest.TestCase):
+    def test_single_load(self):
+        directory = tempfile.mkdtemp()
+        r = RateProfile('Li', 40)
+        r.export_profile('test', 1, 'test_data', directory)
+        profile_database_cache.clear()
+        with unittest.mock.patch('numpy.load', wraps=numpy.load) as load:
+            for i in range(5):
+                self.assertEqual('test_data', r.import_profile('test', 1, directory))
+        self.assertEqual(1, load.call_count, msg='Profile database is loaded more than once')
+
+    def test_change_detection(self):
+        directory = tempfile.mkdtemp()
+        r = RateProfile('Li', 40)
+        r.export_profile('test', 1, 'test_data', directory)
+        r.import_profile('test', 1, directory)
+        numpy.save(r.get_file_name(directory), {'0.04': {'test': {'1': 'changed test_data'}}})
+        self.assertEqual('changed test_data', r.import_profile('test', 1, directory))
+
+    def test_batch(self):
+        directory = tempfile.mkdtemp()
+        r = RateProfile('Li', 40)
+        with unittest.mock.patch('numpy.save', wraps=numpy.save) as save:
+            with profile_database_cache.batch():
+                r.export_profile('test', 1, 'test_data1', directory)
+                r.export_profile('test', -1, 'test_data2', directory)
+                self.assertFalse(os.path.exists(r.get_file_name(directory)))
+                self.assertEqual('test_data1', r.import_profile('test', 1, directory))
+        self.assertEqual(1, save.call_count, msg='Batched exports are not saved at once')
+        profile_database_cache.clear()
+        self.assertEqual('test_data2', r.import_profile('test', -1, directory))
+
+    def test_interrupted_save(self):
+        directory = tempfile.mkdtemp()
+        r = RateProfile('Li', 40)
+        r.export_profile('test', 1, 'test_data1', directory)
+
+        def interrupted_save(f, profile_database):
+            f.write(b'\x93NUMPY')
+            raise KeyboardInterrupt
+
+        with unittest.mock.patch('numpy.save', side_effect=interrupted_save):
+            with self.assertRaises(KeyboardInterrupt):
+                r.export_profile('test', -1, 'test_data2', directory)
+        profile_database_cache.pending_databases.clear()
+        profile_database_cache.clear()
+        self.assertEqual('test_data1', r.import_profile('test', 1, directory))
+        self.assertEqual(['Li.npy'], [name for name in os.listdir(directory) if name.endswith('.npy')])
+
+
+class TestColumnarProfileStore(unittest.TestCase):
+    @staticmethod
+    def get_profile(factor=1.0):
+        return RateProfile.get_spline([10., 20., 50., 100., 200.], factor * numpy.array([1., 3., 5., 10., 12.]))
+
+    def assert_profile_equal(self, reference_profile, result_profile, msg=None):
+        numpy.testing.assert_allclose(reference_profile.x, result_profile.x, rtol=1e-14, err_msg=msg)
+        numpy.testing.assert_allclose(reference_profile.y, result_profile.y, rtol=1e-14, atol=1e-14, err_msg=msg)
+
+    def test_storage_invalid(self):
+        r = RateProfile('Li', 40)
+        self.assertRaises(ValueError, r.set_profile_storage, 'invalid')
+
+    def test_import_profile_not_exist(self):
+        r = RateProfile('Li', 40)
+        r.set_profile_storage('columnar')
+        with self.assertRaises(FileNotFoundError) as i:
+            r.import_profile('invalid profile', 0, tempfile.mkdtemp())
+        self.assertEqual('There is no profile for Li', str(i.exception))
+
+    def test_export_and_import_database(self):
+        directory = tempfile.mkdtemp()
+        r = RateProfile('Li', 40)
+        r.set_profile_storage('columnar')
+        r.export_profile('test', 1, self.get_profile(1.), directory)
+        r.export_profile('test', -1, self.get_profile(2.), directory)
+        r.export_profile('test', 1, self.get_profile(3.), directory)
+        self.assert_profile_equal(self.get_profile(3.), r.import_profile('test', 1, directory))
+        self.assert_profile_equal(self.get_profile(2.), r.import_profile('test', -1, directory))
+        with self.assertRaises(KeyError) as i:
+            r.import_profile('another', 1, directory)
+        self.assertEqual('The profile is not found: another (Tabata 1D)', i.exception.args[0])
+
+    def test_error_estimate(self):
+        directory = tempfile.mkdtemp()
+        r = RateProfile('Li', 40)
+        r.set_profile_storage('columnar')
+        profile = self.get_profile()
+        profile.error = 1e-4
+        r.export_profile('test', 1, profile, directory)
+        r.export_profile('test', 2, self.get_profile(), directory)
+        self.assertEqual(1e-4, r.import_profile('test', 1, directory).error)
+        self.assertFalse(hasattr(r.import_profile('test', 2, directory), 'error'))
+
+    def test_convert(self):
+        directory = tempfile.mkdtemp()
+        r = RateProfile('Li', 40)
+        r.export_profile('test', 2, self.get_profile(), directory)
+        convert_pickle_database(r.get_file_name(directory), directory, 'Li')
+        os.remove(r.get_file_name(directory))
+        r.set_profile_storage('columnar')
+        self.assert_profile_equal(self.get_profile(), r.import_profile('test', 2, directory))
+
+    def test_memory_map(self):
+        store = ColumnarProfileStore(tempfile.mkdtemp(), 'Li')
+        store.write('a', [1., 2.], [3., 4.])
+        store.write('b', [5., 6., 7.], [8., 9., 10.])
+        temperatures, rates = store.read('b')
+        numpy.testing.assert_array_equal([5., 6., 7.], temperatures)
+        numpy.testing.assert_array_equal([8., 9., 10.], rates)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import numpy
+
+from sibeira.rate import Rate
+from sibeira.rate_profile import RateProfile
+from sibeira.rate_table import RateTable, load_rate_table
+
+
+def get_rates(beam_energy, temperatures):
+    r = Rate('Li', beam_energy)
+    r.set_integration_method('gauss')
+    return r.get_full_rates_with_beb(temperatures, 2)
+
+
+class TestRateTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.rate_table = RateTable('Li', 'beb', 2, numpy.geomspace(20000., 80000., 9),
+                                   numpy.geomspace(10., 1000., 11)).compute()
+
+    def test_grid(self):
+        rates = get_rates(40000., self.rate_table.temperatures)
+        index = numpy.argmin(numpy.abs(self.rate_table.beam_energies - 40000.))
+        self.assertAlmostEqual(40000., self.rate_table.beam_energies[index], delta=1e-9)
+        numpy.testing.assert_allclose(self.rate_table.get_rate(self.rate_table.temperatures, 40000.), rates,
+                                      rtol=1e-10)
+
+    def test_intermediate_beam_energy(self):
+        temperatures = numpy.array([15., 150., 700.])
+        rates = get_rates(40500., temperatures)
+        self.assertLess(self.rate_table.error, 0.02)
+        numpy.testing.assert_allclose(self.rate_table.get_rate(temperatures, 40500.), rates,
+                                      rtol=self.rate_table.error)
+
+    def test_non_positive_temperature(self):
+        self.assertEqual(0., self.rate_table.get_rate([0., 100.], 40500.)[0])
+
+    def test_temperature_extrapolation(self):
+        temperatures = numpy.array([1., 3., 7., 10. * (1.0 - 1e-9), 10., 1000., 1000. * (1.0 + 1e-9), 1500.])
+        rates = self.rate_table.get_rate(temperatures, 40500.)
+        self.assertGreater(rates[1] / rates[0], 1.1)
+        numpy.testing.assert_allclose(rates[2], get_rates(40500., [7.]), rtol=1e-2)
+        numpy.testing.assert_allclose(rates[3], rates[4], rtol=1e-8)
+        numpy.testing.assert_allclose(rates[6], rates[5], rtol=1e-8)
+        self.assertNotAlmostEqual(rates[7] / rates[5], 1.0, places=3)
+        self.assertAlmostEqual(numpy.exp(self.rate_table.get_profile(40500.)(numpy.log(3.))), rates[1], delta=1e-25)
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.rate_table.get_rate([100.], 90000.)
+
+    def test_invalid_profile(self):
+        with self.assertRaises(ValueError):
+            RateTable('Li', 'adas')
+
+    def test_save_and_load(self):
+        path = os.path.join(tempfile.mkdtemp(), 'Li.npz')
+        self.rate_table.save(path)
+        rate_table = load_rate_table(path)
+        self.assertEqual('beb', rate_table.profile_name)
+        self.assertEqual(self.rate_table.error, rate_table.error)
+        numpy.testing.assert_array_equal(self.rate_table.get_rate([50., 500.], 40500.),
+                                         rate_table.get_rate([50., 500.], 40500.))
+
+    def test_rate_profile(self):
+        r = RateProfile('Li', 40500.)
+        r.set_rate_table(self.rate_table)
+        r.import_profile = None
+        radial_coordinates = numpy.linspace(0.6, 0.74, 20)
+        temperatures = numpy.linspace(800., 10., 20)
+        densities = numpy.linspace(2e19, 1e17, 20)
+        rates = self.rate_table.get_rate(temperatures, 40500.) * densities / r.speed
+        attenuation = numpy.exp(numpy.concatenate(([0.], numpy.cumsum(
+            0.5 * (rates[1:] + rates[:-1]) * numpy.diff(radial_coordinates)))))
+        numpy.testing.assert_allclose(r.get_attenuation(radial_coordinates, temperatures, densities, 'beb', 2),
+                                      attenuation, rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
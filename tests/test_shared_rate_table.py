@@ -0,0 +1,85 @@
+import concurrent.futures
+import os
+import pickle
+import tempfile
+import unittest
+import numpy
+
+from sibeira.rate_profile import RateProfile
+from sibeira.shared_rate_table import SharedRateTableHandle, SharedRateTables, publish_profiles
+
+radial_coordinates = numpy.linspace(0.6, 0.74, 50)
+temperatures = numpy.linspace(800., 10., 50)
+densities = numpy.linspace(2e19, 1e17, 50)
+
+
+def get_worker_attenuation(handle, species, beam_energy):
+    r = RateProfile(species, beam_energy)
+    r.set_shared_rate_tables(handle)
+    r.import_profile = None
+    return r.get_attenuation(radial_coordinates, temperatures, densities, 'nrl')
+
+
+class TestSharedRateTables(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.profiles = {}
+        for species, beam_energy, rate in [('Li', 40000, 5e-14), ('Na', 60000, 3e-14)]:
+            r = RateProfile(species, beam_energy)
+            profile = r.get_spline([10., 30., 100., 300., 1000.], rate * numpy.array([0.2, 0.6, 1.0, 1.4, 1.6]))
+            profile.error = 1e-3
+            for storage in ['pickle', 'columnar']:
+                r.set_profile_storage(storage)
+                r.export_profile('nrl', -1, profile, self.directory.name)
+            self.profiles[species, beam_energy] = profile
+
+    def get_reference(self, species, beam_energy):
+        return RateProfile(species, beam_energy).get_attenuation_from_profile(
+            self.profiles[species, beam_energy], radial_coordinates, temperatures, densities)
+
+    def check_handle(self, handle):
+        self.assertEqual(sorted(handle.index), ['Li/40.0/nrl/-1', 'Na/60.0/nrl/-1'])
+        copy = pickle.loads(pickle.dumps(handle))
+        self.assertIsNone(copy.data)
+        temperatures_view, rates_view = copy.get_arrays('Na/60.0/nrl/-1')
+        self.assertFalse(rates_view.flags.writeable)
+        numpy.testing.assert_allclose(rates_view, numpy.exp(self.profiles['Na', 60000].y), rtol=1e-14)
+        self.assertEqual(copy.get_profile('Li/40.0/nrl/-1').error, 1e-3)
+        del temperatures_view, rates_view
+        copy.detach()
+
+    def test_memmap(self):
+        path = os.path.join(self.directory.name, 'rates.bin')
+        tables = publish_profiles(['Li', 'Na'], 'memmap', path, self.directory.name, 'columnar')
+        self.check_handle(tables.handle)
+        self.assertLess(len(pickle.dumps(tables.handle)), 1000)
+        numpy.testing.assert_allclose(get_worker_attenuation(tables.handle, 'Li', 40000),
+                                      self.get_reference('Li', 40000), rtol=1e-14)
+
+    def test_shared_memory(self):
+        try:
+            tables = publish_profiles(['Li', 'Na'], destination_directory=self.directory.name)
+        except ValueError:
+            self.skipTest('no multiprocessing.shared_memory')
+        with tables:
+            self.check_handle(tables.handle)
+            with concurrent.futures.ProcessPoolExecutor(2) as executor:
+                attenuations = list(executor.map(get_worker_attenuation, [tables.handle] * 2, ['Li', 'Na'],
+                                                 [40000, 60000]))
+            numpy.testing.assert_allclose(attenuations[0], self.get_reference('Li', 40000), rtol=1e-14)
+            numpy.testing.assert_allclose(attenuations[1], self.get_reference('Na', 60000), rtol=1e-14)
+
+    def test_missing_profile(self):
+        handle = SharedRateTableHandle('memmap', 'unused', 0, {})
+        self.assertIsNone(handle.find_profile('Li', '40.0', 'nrl', '-1'))
+
+    def test_backend(self):
+        with self.assertRaises(ValueError):
+            SharedRateTables({}, 'memmap')
+        with self.assertRaises(ValueError):
+            SharedRateTables({}, 'redis')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import numpy
 from sibeira.species import *
 import unittest
 
@@ -47,5 +48,22 @@ class TestSpecies(unittest.TestCase):
         self.assertAlmostEqual(2.0*7.223*RYDBERG, o.get('U'), places=1, msg='U from variation theory for Li+')
 
 
+class TestOrbitalConstantTable(unittest.TestCase):
+    def test_table(self):
+        for species in orbital_constants:
+            o = OrbitalConstants(species)
+            self.assertEqual(orbital_constant_table[(species, 0)], [o.get(field) for field in orbital_constant_fields])
+
+    def test_arrays(self):
+        o = get_orbital_constant_arrays(['Li', 'Na', 'Li'], [0, 0, 1])
+        numpy.testing.assert_array_equal(o['B'], [5.391714996, 5.13907696, 75.6400970])
+        numpy.testing.assert_array_equal(o['N'], [1, 1, 2])
+        self.assertEqual(get_orbital_constant_arrays('Cs')['n'].shape, ())
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_orbital_constant_arrays(['Li', 'H'], 1)
+
+
 if __name__ == '__main__':
     unittest.main()
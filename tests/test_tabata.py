@@ -1,7 +1,12 @@
+import os
+import shutil
+import tempfile
 import unittest
+import unittest.mock
 import numpy
 
-from tabata_ctf.cross_section import CrossSection
+from tabata_ctf.cross_section import CrossSection, compile_tabata_table, get_tabata_path, get_tabata_table, \
+    load_tabata_table, read_tabata_table
 
 
 class TestTabataCrossSection(unittest.TestCase):
@@ -20,5 +25,60 @@ class TestTabataCrossSection(unittest.TestCase):
         self.assertFalse(numpy.isnan(value))
 
 
+class TestTabataFunction(unittest.TestCase):
+    def test_threshold(self):
+        energy = numpy.logspace(0, 6, 50)
+        c = CrossSection('Na', 'double')
+        cross_section = c.get_function()(energy)
+        self.assertFalse(numpy.any(numpy.isnan(cross_section)))
+        numpy.testing.assert_array_equal(cross_section[energy <= c.get_threshold()], 0.0)
+
+    def test_above_threshold(self):
+        energy = numpy.logspace(2, 6, 50)
+        c = CrossSection('Li')
+        numpy.testing.assert_array_equal(c.get_function()(energy), c.calculate(energy))
+
+    def test_table(self):
+        energy = numpy.logspace(1, 6, 500)
+        c = CrossSection('Li')
+        numpy.testing.assert_allclose(c.get_table()(energy), c.get_function()(energy), rtol=1e-4)
+
+
+class TestTabataTable(unittest.TestCase):
+    def test_cached_table(self):
+        table = get_tabata_table('single')
+        self.assertIs(table, get_tabata_table('single'))
+        self.assertFalse(table.flags.writeable)
+
+    def test_coefficients(self):
+        c = CrossSection('Li', 'double')
+        self.assertEqual(0.0667, c.tabata_data['Et'])
+        self.assertEqual(numpy.inf, c.tabata_data['a3'])
+        self.assertIsInstance(c.tabata_data['a1'], float)
+
+    def test_compiled_table(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shutil.copy(get_tabata_path('double'), directory.name)
+        reference = read_tabata_table(get_tabata_path('double'))
+        with unittest.mock.patch('tabata_ctf.cross_section.get_tabata_path',
+                                 lambda degree, extension='.dat': os.path.join(directory.name, degree + extension)):
+            compile_tabata_table('double')
+            compiled_path = os.path.join(directory.name, 'double.npy')
+            self.assertTrue(os.path.exists(compiled_path))
+            with unittest.mock.patch('tabata_ctf.cross_section.read_tabata_table') as read:
+                table = load_tabata_table('double')
+            read.assert_not_called()
+            numpy.testing.assert_array_equal(table, reference)
+            self.assertFalse(table.flags.writeable)
+
+            data_time = os.path.getmtime(os.path.join(directory.name, 'double.dat'))
+            numpy.save(compiled_path, reference[:1])
+            os.utime(compiled_path, (data_time - 10.0, data_time - 10.0))
+            table = load_tabata_table('double')
+            numpy.testing.assert_array_equal(table, reference)
+            self.assertFalse(table.flags.writeable)
+
+
 if __name__ == '__main__':
     unittest.main()